@@ -8,6 +8,9 @@ import os # <-- ADICIONADO
 
 from abc_tsp_v2 import artificial_bee_colony_tsp
 from aco_tsp import aco_tsp
+# cache de matrizes de distância fica na raiz do projeto
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from instances import load_distance_matrix
 
 # -----------------------
 # Lê parâmetros do terminal
@@ -34,7 +37,7 @@ os.makedirs(output_dir, exist_ok=True)
 np.random.seed(0)
 n_cities = num_cidades
 cities = np.random.rand(n_cities, 2)
-dist_matrix = np.sqrt(((cities[:, None] - cities[None, :])**2).sum(axis=2))
+dist_matrix = load_distance_matrix(cities)  # cache .npy compartilhado entre execuções
 
 # -----------------------
 # Parâmetros
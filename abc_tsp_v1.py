@@ -1,26 +1,53 @@
 import numpy as np
 
+import kernels
+from evaluation import tour_length, tour_lengths
+from random_streams import make_rng
+
 # ---------------------------
 # ABC para TSP
 # ---------------------------
-def tour_length(path, dist_matrix):
-    """Calcula o comprimento do tour (fecha de volta ao início)."""
-    return sum(dist_matrix[path[i], path[(i+1) % len(path)]] for i in range(len(path)))
-
-def artificial_bee_colony_tsp(n_iter=100, n_bees=30, dist_matrix=None, scout_prob=0.1):
+def adjacent_swap_delta(path, a, dist_matrix):
+    """Variação do comprimento ao trocar path[a] com o seguinte, em O(1)."""
+    n = len(path)
+    b = (a + 1) % n
+    prev, x, y, nxt = path[a - 1], path[a], path[b], path[(b + 1) % n]
+    return dist_matrix[prev, y] + dist_matrix[x, nxt] - dist_matrix[prev, x] - dist_matrix[y, nxt]
+
+def _adjacent_swap_moves(bees, positions, dist_matrix):
+    """Troca bees[i][a] com o vizinho seguinte (a = positions[i]) quando isso encurta o tour."""
+    n = bees.shape[1]
+    for i, a in enumerate(positions):
+        if adjacent_swap_delta(bees[i], a, dist_matrix) < 0:
+            b = (a + 1) % n
+            bees[i, a], bees[i, b] = bees[i, b], bees[i, a]
+
+def artificial_bee_colony_tsp(n_iter=100, n_bees=30, dist_matrix=None, scout_prob=0.1,
+                              backend="numpy", rng=None):
     """
     ABC para TSP inspirado no estilo do seu bee.py:
     - fases: abelhas empregadas, observadoras, batedoras (scouts)
     - perturbações por swap
     - probabilidades baseadas em 1/(1+fitness)
+    - backend: 'numpy' ou 'numba' (swaps das empregadas compilados; resultados
+      idênticos bit a bit para a mesma seed; sem numba instalado usa 'numpy')
+    - rng (opcional): numpy.random.Generator ou seed; sem ele, a seed vem do
+      estado global (np.random.seed)
     """
     if dist_matrix is None:
         raise ValueError("dist_matrix não pode ser None")
 
     n_cities = dist_matrix.shape[0]
+    backend = kernels.resolve_backend(backend)
+    rng = make_rng(rng)
+    if backend == "numba" and isinstance(dist_matrix, np.ndarray):
+        dist_arr = np.asarray(dist_matrix)
+        adjacent_swap_moves = lambda bees, positions: kernels.adjacent_swap_moves(bees, positions, dist_arr)
+    else:
+        adjacent_swap_moves = lambda bees, positions: _adjacent_swap_moves(bees, positions, dist_matrix)
     # Inicializa população: permutações aleatórias
-    bees = np.array([np.random.permutation(n_cities) for _ in range(n_bees)])
-    fitness = np.array([tour_length(b, dist_matrix) for b in bees])
+    bees = np.array([rng.permutation(n_cities) for _ in range(n_bees)])
+    fitness = tour_lengths(bees, dist_matrix)
 
     best_idx = np.argmin(fitness)
     best_bee = bees[best_idx].copy()
@@ -32,18 +59,13 @@ def artificial_bee_colony_tsp(n_iter=100, n_bees=30, dist_matrix=None, scout_pro
         # -----------------------
         # FASE 1: Abelhas Empregadas
         # -----------------------
-        for i in range(n_bees):
-            candidate = bees[i].copy()
-            # perturbação simples: swap entre posição a e a+1
-            a = np.random.randint(n_cities)
-            b = (a + 1) % n_cities
-            candidate[a], candidate[b] = candidate[b], candidate[a]
-
-            if tour_length(candidate, dist_matrix) < tour_length(bees[i], dist_matrix):
-                bees[i] = candidate
+        # perturbação simples: swap entre posição a e a+1, avaliado em O(1)
+        positions = rng.integers(n_cities, size=n_bees)
+        if n_cities > 2:
+            adjacent_swap_moves(bees, positions)
 
         # recalcula fitness
-        fitness = np.array([tour_length(b, dist_matrix) for b in bees])
+        fitness = tour_lengths(bees, dist_matrix)
 
         # -----------------------
         # FASE 2: Abelhas Observadoras
@@ -52,25 +74,25 @@ def artificial_bee_colony_tsp(n_iter=100, n_bees=30, dist_matrix=None, scout_pro
         probs /= probs.sum()
 
         for i in range(n_bees):
-            if np.random.rand() < probs[i]:
+            if rng.random() < probs[i]:
                 selected = bees[i].copy()
                 candidate = selected.copy()
                 # perturbação menor / refinada: swap em posições aleatórias
-                a = np.random.randint(n_cities)
-                b = np.random.randint(n_cities)
+                a = rng.integers(n_cities)
+                b = rng.integers(n_cities)
                 candidate[a], candidate[b] = candidate[b], candidate[a]
 
                 if tour_length(candidate, dist_matrix) < tour_length(selected, dist_matrix):
                     bees[i] = candidate
 
-        fitness = np.array([tour_length(b, dist_matrix) for b in bees])
+        fitness = tour_lengths(bees, dist_matrix)
 
         # -----------------------
         # FASE 3: Abelhas Batedoras (Scouts)
         # -----------------------
-        if np.random.rand() < scout_prob:
-            scout_idx = np.random.randint(n_bees)
-            bees[scout_idx] = np.random.permutation(n_cities)
+        if rng.random() < scout_prob:
+            scout_idx = rng.integers(n_bees)
+            bees[scout_idx] = rng.permutation(n_cities)
 
         # Atualiza melhor global
         cur_best_idx = np.argmin(fitness)
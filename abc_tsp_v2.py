@@ -1,81 +1,370 @@
+import multiprocessing as mp
+import time
+
 import numpy as np
 
-def tour_length(path, dist_matrix):
-    return sum(dist_matrix[path[i], path[(i+1) % len(path)]] for i in range(len(path)))
+import kernels
+from evaluation import tour_length, tour_lengths
+from local_search import improve_tour, nearest_neighbors
+from random_streams import make_rng
+from stopping import RunInfo, SolverStats, StopCriteria, collect
 
-def two_opt(path):
-    n = len(path)
-    i, j = np.random.choice(n, 2, replace=False)
+def random_two_opt_move(n, rng=None):
+    i, j = make_rng(rng).choice(n, 2, replace=False)
     if i > j:
         i, j = j, i
+    return i, j
+
+def two_opt_delta(path, i, j, dist_matrix):
+    """
+    Variação do comprimento ao inverter path[i:j], em O(1):
+    só as arestas (path[i-1], path[i]) e (path[j-1], path[j]) mudam.
+    """
+    a, b = path[i - 1], path[i]
+    c, d = path[j - 1], path[j % len(path)]
+    return dist_matrix[a, c] + dist_matrix[b, d] - dist_matrix[a, b] - dist_matrix[c, d]
+
+def apply_two_opt(path, i, j):
+    """Aplica a inversão 2-opt no próprio array."""
+    path[i:j] = np.flip(path[i:j])
+
+def two_opt(path, rng=None):
+    i, j = random_two_opt_move(len(path), rng)
     new_path = path.copy()
-    new_path[i:j] = np.flip(new_path[i:j])
+    apply_two_opt(new_path, i, j)
     return new_path
 
-def artificial_bee_colony_tsp(n_iter=200, n_bees=40, dist_matrix=None, limit=40):
+def random_two_opt_moves(n, size, rng=None):
+    """Sorteia `size` pares (i, j), i < j, de posições distintas, de uma vez."""
+    rng = make_rng(rng)
+    i = rng.integers(n, size=size)
+    j = rng.integers(n - 1, size=size)
+    j += j >= i
+    return np.minimum(i, j), np.maximum(i, j)
+
+def two_opt_deltas(bees, rows, lo, hi, dist_matrix):
+    """two_opt_delta em lote: a fonte rows[m] com o movimento (lo[m], hi[m])."""
+    n = bees.shape[1]
+    a, b = bees[rows, lo - 1], bees[rows, lo]
+    c, d = bees[rows, hi - 1], bees[rows, hi % n]
+    return dist_matrix[a, c] + dist_matrix[b, d] - dist_matrix[a, b] - dist_matrix[c, d]
+
+def apply_two_opt_rows(bees, rows, lo, hi):
+    """Inverte bees[rows[m], lo[m]:hi[m]] para todos os m num único gather."""
+    pos = np.arange(bees.shape[1])
+    lo, hi = lo[:, None], hi[:, None]
+    src = np.where((pos >= lo) & (pos < hi), lo + hi - 1 - pos, pos)
+    bees[rows] = np.take_along_axis(bees[rows], src, axis=1)
+
+def occurrence_rank(targets):
+    """Para cada posição m, quantas vezes targets[m] já apareceu antes de m."""
+    order = np.argsort(targets, kind="stable")
+    sorted_targets = targets[order]
+    rank = np.empty(len(targets), dtype=np.intp)
+    rank[order] = np.arange(len(targets)) - np.searchsorted(sorted_targets, sorted_targets)
+    return rank
+
+def _two_opt_moves(bees, fitness, trial, targets, lo, hi, dist_matrix):
+    """
+    Aplica os movimentos 2-opt (targets[m], lo[m], hi[m]) na ordem dada: a fonte
+    targets[m] só muda se o movimento melhorar o custo; senão, soma uma tentativa.
+    Os movimentos são agrupados em rodadas pela ordem de ocorrência do alvo
+    (rodada k = k-ésima visita a cada fonte); cada rodada tem no máximo um
+    movimento por fonte e é avaliada e aplicada de uma vez, com o mesmo
+    resultado do laço movimento a movimento. Na fase das empregadas (um
+    movimento por fonte) é uma rodada só. Retorna quantos movimentos foram aceitos.
+    """
+    accepted = 0
+    rank = occurrence_rank(targets)
+    for k in range(rank.max() + 1 if len(rank) else 0):
+        m = np.flatnonzero(rank == k)
+        rows = targets[m]
+        delta = two_opt_deltas(bees, rows, lo[m], hi[m], dist_matrix)
+        accept = delta < 0
+        moved = np.flatnonzero(accept)
+        if moved.size:
+            apply_two_opt_rows(bees, rows[moved], lo[m][moved], hi[m][moved])
+            fitness[rows[moved]] += delta[moved]
+        trial[rows[moved]] = 0
+        trial[rows[~accept]] += 1
+        accepted += moved.size
+    return accepted
+
+def select_onlookers(probs, size, rng=None):
+    """
+    Sorteia os alvos de todas as observadoras num único passo: inversa da
+    distribuição acumulada (searchsorted), em vez de `size` chamadas a
+    np.random.choice que revalidam e somam `probs` a cada vez.
+    """
+    cum = np.cumsum(probs)
+    u = make_rng(rng).random(size) * cum[-1]
+    return np.minimum(np.searchsorted(cum, u, side="right"), len(probs) - 1)
+
+def artificial_bee_colony_tsp_iter(n_iter=200, n_bees=40, dist_matrix=None, limit=40,
+                                   local_search=False, time_limit=None, max_evaluations=None,
+                                   patience=None, backend="numpy", rng=None, profile=False):
+    """
+    Versão anytime do artificial_bee_colony_tsp: gerador que, a cada iteração,
+    produz (iteração, melhor custo, melhor caminho ou None se não melhorou,
+    tempo decorrido). Ao terminar, retorna o RunInfo (StopIteration.value),
+    com RunInfo.stats se profile=True. Um array de caminhos enviado com send() substitui as piores fontes da
+    colônia (migração do modo ilhas).
+    """
     if dist_matrix is None:
         raise ValueError("dist_matrix não pode ser None")
 
     n = dist_matrix.shape[0]
+    backend = kernels.resolve_backend(backend)
+    rng = make_rng(rng)
+    if backend == "numba" and isinstance(dist_matrix, np.ndarray):
+        dist_arr = np.asarray(dist_matrix)
+        two_opt_moves = lambda *args: kernels.two_opt_moves(*args, dist_arr)
+    else:
+        # o kernel compilado precisa de uma matriz densa (não de um DistanceOracle)
+        two_opt_moves = lambda *args: _two_opt_moves(*args, dist_matrix)
+    if local_search:
+        ls_neighbors = nearest_neighbors(dist_matrix, 10)
 
-    bees = np.array([np.random.permutation(n) for _ in range(n_bees)])
-    fitness = np.array([tour_length(b, dist_matrix) for b in bees])
+    bees = np.array([rng.permutation(n) for _ in range(n_bees)])
+    fitness = tour_lengths(bees, dist_matrix)
     trial = np.zeros(n_bees, dtype=int)
 
     best_idx = np.argmin(fitness)
     best_bee = bees[best_idx].copy()
     best_fit = fitness[best_idx]
 
-    history = []
+    stop = StopCriteria(time_limit, max_evaluations, patience)
+    iterations = 0
+    evaluations = n_bees
+    stats = SolverStats() if profile else None
 
     for it in range(n_iter):
+        if stats is not None:
+            stats.start()
 
         # -------------------- EMPLOYED BEES --------------------
-        for i in range(n_bees):
-            candidate = two_opt(bees[i])
-            cand_fit = tour_length(candidate, dist_matrix)
-            if cand_fit < fitness[i]:
-                bees[i] = candidate
-                fitness[i] = cand_fit
-                trial[i] = 0
-            else:
-                trial[i] += 1
+        accepted = two_opt_moves(bees, fitness, trial, np.arange(n_bees),
+                                 *random_two_opt_moves(n, n_bees, rng))
+        if stats is not None:
+            stats.accepted_moves += accepted
+            stats.mark("employed")
 
         # Probabilidades
         inv = 1.0 / (1.0 + fitness)
         probs = inv / inv.sum()
 
         # -------------------- ONLOOKER BEES --------------------
-        for _ in range(n_bees):
-            i = np.random.choice(n_bees, p=probs)
-            candidate = two_opt(bees[i])
-            cand_fit = tour_length(candidate, dist_matrix)
-
-            if cand_fit < fitness[i]:
-                bees[i] = candidate
-                fitness[i] = cand_fit
-                trial[i] = 0
-            else:
-                trial[i] += 1
+        targets = select_onlookers(probs, n_bees, rng)
+        accepted = two_opt_moves(bees, fitness, trial, targets, *random_two_opt_moves(n, n_bees, rng))
+        if stats is not None:
+            stats.accepted_moves += accepted
+            stats.mark("onlooker")
 
         # -------------------- SCOUTS --------------------
-        for i in range(n_bees):
-            if trial[i] > limit:
-                bees[i] = np.random.permutation(n)
-                fitness[i] = tour_length(bees[i], dist_matrix)
-                trial[i] = 0
+        scouts = np.flatnonzero(trial > limit)
+        if scouts.size:
+            for i in scouts:
+                bees[i] = rng.permutation(n)
+            fitness[scouts] = tour_lengths(bees[scouts], dist_matrix)
+            trial[scouts] = 0
+        if stats is not None:
+            stats.mark("scout")
+
+        # -------------------- BUSCA LOCAL --------------------
+        if local_search:
+            k = np.argmin(fitness)
+            bees[k] = improve_tour(bees[k], dist_matrix, ls_neighbors, stats)
+            fitness[k] = tour_length(bees[k], dist_matrix)
+            if stats is not None:
+                stats.mark("local_search")
 
         # -------------------- ELITISMO --------------------
         cur_best_idx = np.argmin(fitness)
         cur_best_fit = fitness[cur_best_idx]
 
-        if cur_best_fit < best_fit:
-            best_fit = cur_best_fit
+        improved = cur_best_fit < best_fit
+        if improved:
+            # recalcula o custo exato (os deltas acumulam erro de arredondamento)
+            fitness[cur_best_idx] = tour_length(bees[cur_best_idx], dist_matrix)
+            best_fit = fitness[cur_best_idx]
             best_bee = bees[cur_best_idx].copy()
+        if stats is not None:
+            stats.mark("elitism")
+
+        iterations += 1
+        evaluations += 2 * n_bees + scouts.size + (1 if local_search else 0)
+        # a primeira iteração sempre informa o caminho (melhor da população inicial)
+        migrants = yield it, best_fit, best_bee if improved or it == 0 else None, stop.elapsed()
+        if migrants is not None:
+            migrants = np.atleast_2d(migrants)
+            worst = np.argsort(fitness)[-len(migrants):]
+            bees[worst] = migrants
+            fitness[worst] = tour_lengths(migrants, dist_matrix)
+            trial[worst] = 0
+            evaluations += len(migrants)
+        if stop.should_stop(best_fit, evaluations):
+            break
+
+    return stop.info(iterations, evaluations, stats)
+
+def artificial_bee_colony_tsp(n_iter=200, n_bees=40, dist_matrix=None, limit=40,
+                              local_search=False, time_limit=None, max_evaluations=None,
+                              patience=None, return_info=False, backend="numpy", rng=None,
+                              profile=False):
+    """
+    ABC para TSP com vizinhança 2-opt:
+    - abelhas empregadas e observadoras avaliam movimentos 2-opt em O(1); a fase
+      das empregadas sorteia, avalia e aplica os movimentos de toda a população
+      em lote, e as observadoras escolhem todas as fontes num único sorteio
+    - batedoras (scouts) reiniciam fontes com mais de `limit` tentativas sem melhora
+    - local_search (opcional): 2-opt + Or-opt na melhor fonte de cada iteração
+    - time_limit / max_evaluations / patience (opcionais): param antes de n_iter;
+      com return_info=True o quarto valor retornado (RunInfo) diz qual disparou
+    - backend: 'numpy' ou 'numba' (movimentos 2-opt compilados; resultados
+      idênticos bit a bit para a mesma seed; sem numba instalado usa 'numpy')
+    - rng (opcional): numpy.random.Generator ou seed; sem ele, a seed vem do
+      estado global (np.random.seed)
+    - profile (opcional): acrescenta ao retorno um SolverStats com o tempo
+      acumulado de cada fase (employed, onlooker, scout, local_search, elitism),
+      tours avaliados e movimentos aceitos; desligado, não mede nada
+    """
+    run = artificial_bee_colony_tsp_iter(n_iter, n_bees, dist_matrix, limit, local_search,
+                                         time_limit, max_evaluations, patience, backend, rng,
+                                         profile)
+    best_bee, best_fit, history, info = collect(run)
+    result = (best_bee, best_fit, history)
+    if return_info:
+        result += (info,)
+    if profile:
+        result += (info.stats,)
+    return result
+
+# ---------------------------
+# Modo ilhas: colônias independentes em processos, com migração periódica
+# ---------------------------
+TOPOLOGIES = ("ring", "random")
+
+def _island_worker(conn, rng, dist_matrix, params):
+    """
+    Processo de uma ilha: mantém o gerador da colônia vivo entre as épocas.
+    Cada mensagem (passos, imigrante) roda até `passos` iterações e responde
+    (histórico da época, melhor caminho, RunInfo ou None se ainda não parou).
+    """
+    run = artificial_bee_colony_tsp_iter(dist_matrix=dist_matrix, rng=rng, **params)
+    best_bee, info = None, None
+    while True:
+        msg = conn.recv()
+        if msg is None:
+            break
+        steps, migrant = msg
+        history = []
+        while info is None and len(history) < steps:
+            try:
+                _, best_fit, path, _ = run.send(migrant)
+            except StopIteration as done:
+                info = done.value
+                break
+            migrant = None
+            history.append(best_fit)
+            if path is not None:
+                best_bee = path
+        conn.send((history, best_bee, info))
+    conn.close()
+
+def _migration_sources(n_islands, topology, rng):
+    """Para cada ilha, a ilha de onde vem o imigrante (None se não houver)."""
+    if n_islands < 2:
+        return [None] * n_islands
+    if topology == "ring":
+        return [(k - 1) % n_islands for k in range(n_islands)]
+    # random: qualquer outra ilha, sorteada a cada migração
+    offsets = rng.integers(1, n_islands, size=n_islands)
+    return [int((k + off) % n_islands) for k, off in enumerate(offsets)]
+
+def artificial_bee_colony_tsp_islands(n_islands=4, migration_interval=20, topology="ring",
+                                      n_iter=200, n_bees=40, dist_matrix=None, limit=40,
+                                      local_search=False, time_limit=None, max_evaluations=None,
+                                      patience=None, return_info=False, backend="numpy",
+                                      rng=None):
+    """
+    ABC em modelo de ilhas:
+    - n_islands colônias independentes (artificial_bee_colony_tsp_iter), cada
+      uma no seu processo, com fluxos aleatórios independentes derivados de
+      `rng` por SeedSequence.spawn (Generator.spawn)
+    - a cada migration_interval iterações, cada ilha recebe a melhor fonte de
+      outra ilha no lugar da sua pior: topology='ring' (ilha k-1 -> k) ou
+      'random' (origem sorteada a cada migração)
+    - time_limit e patience valem para cada ilha; max_evaluations é dividido
+      entre as ilhas
+    - history: melhor custo entre todas as ilhas a cada iteração
+    - demais parâmetros como em artificial_bee_colony_tsp
+    """
+    if dist_matrix is None:
+        raise ValueError("dist_matrix não pode ser None")
+    if topology not in TOPOLOGIES:
+        raise ValueError(f"topology deve ser um de {TOPOLOGIES}")
+    if n_islands < 1 or migration_interval < 1:
+        raise ValueError("n_islands e migration_interval devem ser positivos")
+
+    if max_evaluations is not None:
+        max_evaluations = max(1, max_evaluations // n_islands)
+    params = dict(n_iter=n_iter, n_bees=n_bees, limit=limit, local_search=local_search,
+                  time_limit=time_limit, max_evaluations=max_evaluations, patience=patience,
+                  backend=backend)
+    rng = make_rng(rng)
+    streams = rng.spawn(n_islands)
+
+    t0 = time.perf_counter()
+    ctx = mp.get_context()
+    conns, procs = [], []
+    try:
+        for stream in streams:
+            parent, child = ctx.Pipe()
+            proc = ctx.Process(target=_island_worker, args=(child, stream, dist_matrix, params),
+                               daemon=True)
+            proc.start()
+            child.close()
+            conns.append(parent)
+            procs.append(proc)
+
+        best_bees = [None] * n_islands
+        best_fits = np.full(n_islands, np.inf)
+        infos = [None] * n_islands
+        migrants = [None] * n_islands
+        history = []
+        while any(info is None for info in infos):
+            active = [k for k in range(n_islands) if infos[k] is None]
+            for k in active:
+                conns[k].send((migration_interval, migrants[k]))
+            chunks = {}
+            for k in active:
+                chunks[k], best_bees[k], infos[k] = conns[k].recv()
+
+            for step in range(max(len(chunk) for chunk in chunks.values())):
+                for k, chunk in chunks.items():
+                    if step < len(chunk):
+                        best_fits[k] = chunk[step]
+                history.append(best_fits.min())
 
-        history.append(best_fit)
+            sources = _migration_sources(n_islands, topology, rng)
+            migrants = [best_bees[src] if src is not None else None for src in sources]
+    finally:
+        for conn in conns:
+            try:
+                conn.send(None)
+            except OSError:
+                pass
+            conn.close()
+        for proc in procs:
+            proc.join()
 
-    return best_bee, best_fit, history
+    k = int(np.argmin(best_fits))
+    reasons = sorted({info.stop_reason for info in infos})
+    info = RunInfo(",".join(reasons), max(info.iterations for info in infos),
+                   sum(info.evaluations for info in infos), time.perf_counter() - t0)
+    if return_info:
+        return best_bees[k], best_fits[k], history, info
+    return best_bees[k], best_fits[k], history
 
 if __name__ == "__main__":
     import matplotlib.pyplot as plt
@@ -1,20 +1,207 @@
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
 import numpy as np
 
+import kernels
+from distance import as_dense
+from evaluation import tour_length, tour_lengths
+from local_search import improve_tour, nearest_neighbors
+from random_streams import make_rng
+from stopping import SolverStats, StopCriteria, collect
+
 # ---------------------------
 # ACO para TSP
 # ---------------------------
-def tour_length(path, dist_matrix):
-    return sum(dist_matrix[path[i], path[(i+1) % len(path)]] for i in range(len(path)))
+def roulette_sample(weights, u):
+    """
+    Roleta vetorizada: para cada linha de `weights` sorteia um índice com
+    probabilidade proporcional ao peso, usando o sorteio uniforme u[linha].
+    Equivale a um searchsorted(side='right') de u*total na soma acumulada de
+    cada linha, sem normalizar nem validar probabilidades como np.random.choice.
+    """
+    cum = np.cumsum(weights, axis=1)
+    total = cum[:, -1]
+    # alvo limitado abaixo de total para nunca cair numa cidade de peso zero
+    target = np.minimum(u * total, np.nextafter(total, 0))
+    return (cum <= target[:, None]).sum(axis=1)
+
+def _full_scan_step(choice_info, cur, visited, u):
+    """Escolhe a próxima cidade entre todas as não visitadas."""
+    weights = choice_info[cur]
+    weights[visited] = 0.0
+    # linhas sem informação: escolha uniforme entre as não visitadas
+    empty = ~weights.any(axis=1)
+    if empty.any():
+        weights[empty] = ~visited[empty]
+    return roulette_sample(weights, u)
 
-def aco_tsp(n_iter=100, n_ants=30, dist_matrix=None, alpha=1.0, beta=5.0, rho=0.5):
+def _candidate_step(choice_info, candidates, cur, visited, u):
     """
-    Implementação ACO simples/limpa:
-    - feromônio em matriz completa
-    - probabilidades baseadas em (tau^alpha) * (eta^beta), eta = 1/dist
-    - atualização: evaporacao + deposição proporcional a 1/length
+    Escolhe a próxima cidade só entre as k candidatas de cada formiga;
+    volta para a varredura completa quando todas as candidatas já foram visitadas.
+    """
+    n_ants = cur.shape[0]
+    cand = candidates[cur]
+    available = ~visited[np.arange(n_ants)[:, None], cand]
+    weights = choice_info[cur[:, None], cand] * available
+    empty = ~weights.any(axis=1)
+    if empty.any():
+        weights[empty] = available[empty]
+
+    has_cand = available.any(axis=1)
+    nxt = np.empty(n_ants, dtype=np.intp)
+    if has_cand.any():
+        picked = roulette_sample(weights[has_cand], u[has_cand])
+        nxt[has_cand] = cand[has_cand, picked]
+    rest = ~has_cand
+    if rest.any():
+        nxt[rest] = _full_scan_step(choice_info, cur[rest], visited[rest], u[rest])
+    return nxt
+
+def construct_tours(choice_info, n_ants, candidates=None, backend="numpy", rng=None):
+    """
+    Constrói os caminhos de todas as formigas ao mesmo tempo:
+    - choice_info = (tau^alpha) * (eta^beta), calculada uma vez por iteração
+    - máscara booleana de cidades visitadas com shape (n_ants, n)
+    - a cada passo, os pesos de todas as formigas saem de uma única indexação
+      e a próxima cidade de um único sorteio em lote (roulette_sample)
+    - candidates (opcional): listas de vizinhos mais próximos (n, k); cada
+      formiga considera só essas k cidades enquanto houver alguma livre
+    - backend: 'numpy' ou 'numba' (kernel compilado, mesmos caminhos)
+    - rng: Generator (ou seed) dos sorteios; ver random_streams.make_rng
+    - retorna os caminhos como array de inteiros (n_ants, n)
+    """
+    backend = kernels.resolve_backend(backend)
+    rng = make_rng(rng)
+    n = choice_info.shape[0]
+    starts = rng.integers(n, size=n_ants)
+    u = rng.random((n - 1, n_ants))
+    return _construct(backend, choice_info, starts, u, candidates)
+
+def _construct(backend, choice_info, starts, u, candidates):
+    if backend == "numba":
+        if candidates is None:
+            candidates = np.empty((choice_info.shape[0], 0), dtype=np.intp)
+        return kernels.construct_from_draws(choice_info, starts, u, candidates)
+    return _construct_from_draws(choice_info, starts, u, candidates)
+
+def _construct_from_draws(choice_info, starts, u, candidates=None):
+    """
+    Construção a partir de sorteios já feitos: starts (n_ants,) e u (n-1, n_ants),
+    um uniforme por formiga e passo. Cada formiga depende só da sua coluna,
+    então dividir as formigas entre processos não muda os caminhos.
+    """
+    n = choice_info.shape[0]
+    n_ants = starts.shape[0]
+    ants = np.arange(n_ants)
+    paths = np.empty((n_ants, n), dtype=np.intp)
+    visited = np.zeros((n_ants, n), dtype=bool)
+
+    cur = starts
+    paths[:, 0] = cur
+    visited[ants, cur] = True
+
+    for step in range(1, n):
+        if candidates is None:
+            cur = _full_scan_step(choice_info, cur, visited, u[step - 1])
+        else:
+            cur = _candidate_step(choice_info, candidates, cur, visited, u[step - 1])
+        paths[:, step] = cur
+        visited[ants, cur] = True
+
+    return paths
+
+# ---------------------------
+# Construção paralela (pool de processos + memória compartilhada)
+# ---------------------------
+_WORKER = {}
+
+def _init_worker(specs, candidates, backend):
+    """Anexa, no processo worker, os arrays compartilhados criados pelo _AntPool."""
+    for key, (name, shape, dtype) in specs.items():
+        shm = shared_memory.SharedMemory(name=name)
+        _WORKER[key + "_shm"] = shm  # mantém o bloco aberto enquanto o worker viver
+        _WORKER[key] = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+    _WORKER["candidates"] = candidates
+    _WORKER["backend"] = kernels.resolve_backend(backend)  # compila os kernels no worker
+
+def _construct_chunk(starts, u):
+    paths = _construct(_WORKER["backend"], _WORKER["choice_info"], starts, u, _WORKER["candidates"])
+    return paths, tour_lengths(paths, _WORKER["dist"])
+
+class _AntPool:
+    """
+    Divide as formigas de cada iteração entre `workers` processos:
+    - dist, pher, eta e choice_info ficam em multiprocessing.shared_memory e
+      nunca são serializados; o processo principal altera pher e choice_info
+      no próprio bloco compartilhado
+    - cada worker recebe só os sorteios das suas formigas e devolve caminhos
+      e comprimentos para a evaporação/depósito centralizados
+    """
+
+    def __init__(self, workers, arrays, candidates=None, backend="numpy"):
+        self.workers = workers
+        self.blocks = []
+        self.arrays = {}
+        specs = {}
+        for key, arr in arrays.items():
+            arr = np.ascontiguousarray(arr)
+            shm = shared_memory.SharedMemory(create=True, size=max(arr.nbytes, 1))
+            view = np.ndarray(arr.shape, dtype=arr.dtype, buffer=shm.buf)
+            view[...] = arr
+            self.blocks.append(shm)
+            self.arrays[key] = view
+            specs[key] = (shm.name, arr.shape, arr.dtype.str)
+        self.executor = ProcessPoolExecutor(workers, initializer=_init_worker,
+                                            initargs=(specs, candidates, backend))
+
+    def construct(self, starts, u):
+        chunks = [idx for idx in np.array_split(np.arange(len(starts)), self.workers) if idx.size]
+        futures = [self.executor.submit(_construct_chunk, starts[idx], u[:, idx]) for idx in chunks]
+        results = [f.result() for f in futures]
+        return (np.concatenate([paths for paths, _ in results]),
+                np.concatenate([lengths for _, lengths in results]))
+
+    def close(self):
+        """Encerra os workers e libera a memória compartilhada (sem views vivas)."""
+        self.executor.shutdown()
+        self.arrays.clear()
+        for shm in self.blocks:
+            shm.close()
+            shm.unlink()
+
+def _deposit(pher, paths, lengths):
+    """
+    Depósito de feromônio proporcional a 1/L em todas as arestas de cada formiga,
+    num único scatter (np.add.at) sobre a lista de arestas de todos os caminhos.
+    As arestas vão intercaladas (a, b), (b, a) formiga a formiga, e o add.at
+    soma na ordem dos índices: o resultado é o mesmo do laço aresta a aresta.
+    """
+    n = paths.shape[1]
+    a = paths
+    b = np.roll(paths, -1, axis=1)
+    contribution = np.repeat(1.0 / (lengths + 1e-12), 2 * n)
+    rows = np.stack([a, b], axis=2).ravel()
+    cols = np.stack([b, a], axis=2).ravel()  # simetriza para simplicidade
+    np.add.at(pher, (rows, cols), contribution)
+
+def aco_tsp_iter(n_iter=100, n_ants=30, dist_matrix=None, alpha=1.0, beta=5.0, rho=0.5,
+                 candidate_k=None, local_search=False, workers=None,
+                 time_limit=None, max_evaluations=None, patience=None, backend="numpy",
+                 rng=None, profile=False):
+    """
+    Versão anytime do aco_tsp: gerador que, a cada iteração, produz
+    (iteração, melhor custo, melhor caminho ou None se não melhorou, tempo decorrido).
+    Quem consome pode parar a qualquer momento; ao terminar, o gerador
+    retorna o RunInfo (StopIteration.value), com RunInfo.stats se profile=True.
     """
     if dist_matrix is None:
         raise ValueError("dist_matrix não pode ser None")
+    dist_matrix = as_dense(dist_matrix)
+    backend = kernels.resolve_backend(backend)
+    rng = make_rng(rng)
+    deposit = kernels.deposit if backend == "numba" else _deposit
 
     n = dist_matrix.shape[0]
     pher = np.ones((n, n))  # feromônio inicial
@@ -22,58 +209,262 @@ def aco_tsp(n_iter=100, n_ants=30, dist_matrix=None, alpha=1.0, beta=5.0, rho=0.
     with np.errstate(divide='ignore'):
         eta = 1.0 / (dist_matrix + np.eye(n))  # evita div por 0; diagonal não usada
     np.fill_diagonal(eta, 0.0)
+    eta_beta = eta ** beta
+    choice_info = (pher ** alpha) * eta_beta
+    candidates = nearest_neighbors(dist_matrix, candidate_k) if candidate_k else None
+    if local_search:
+        ls_neighbors = candidates if candidates is not None else nearest_neighbors(dist_matrix, 10)
+
+    best_path = None
+    best_len = np.inf
+    stop = StopCriteria(time_limit, max_evaluations, patience)
+    iterations = evaluations = 0
+    stats = SolverStats() if profile else None
+
+    pool = None
+    if workers is not None and workers > 1:
+        pool = _AntPool(workers, dict(dist=dist_matrix, pher=pher, eta=eta,
+                                      choice_info=choice_info), candidates, backend)
+        dist_matrix, pher, eta, choice_info = (pool.arrays[k] for k in ("dist", "pher", "eta", "choice_info"))
+
+    try:
+        for it in range(n_iter):
+            if stats is not None:
+                stats.start()
+            if pool is None:
+                all_paths = construct_tours(choice_info, n_ants, candidates, backend, rng)
+                if stats is not None:
+                    stats.mark("construction")
+                all_lengths = tour_lengths(all_paths, dist_matrix)
+                if stats is not None:
+                    stats.mark("evaluation")
+            else:
+                starts = rng.integers(n, size=n_ants)
+                u = rng.random((n - 1, n_ants))
+                # nos workers, construção e avaliação contam juntas
+                all_paths, all_lengths = pool.construct(starts, u)
+                if stats is not None:
+                    stats.mark("construction")
+
+            if local_search:
+                k = int(np.argmin(all_lengths))
+                all_paths[k] = improve_tour(all_paths[k], dist_matrix, ls_neighbors, stats)
+                all_lengths[k] = tour_length(all_paths[k], dist_matrix)
+                evaluations += 1
+                if stats is not None:
+                    stats.mark("local_search")
+
+            # evaporacao
+            pher *= (1.0 - rho)
+            if stats is not None:
+                stats.mark("evaporation")
+            # depositos
+            deposit(pher, all_paths, all_lengths)
+            if stats is not None:
+                stats.mark("deposit")
+            # informação de escolha recalculada uma única vez por iteração
+            # (no próprio array, que pode estar em memória compartilhada)
+            np.multiply(pher ** alpha, eta_beta, out=choice_info)
+            if stats is not None:
+                stats.mark("choice_info")
+
+            # atualiza melhor
+            iter_best_len = min(all_lengths)
+            iter_best_path = all_paths[np.argmin(all_lengths)]
+            improved = iter_best_len < best_len
+            if improved:
+                best_len = iter_best_len
+                best_path = iter_best_path.copy()
+
+            iterations += 1
+            evaluations += n_ants
+            yield it, best_len, best_path if improved else None, stop.elapsed()
+            if stop.should_stop(best_len, evaluations):
+                break
+    finally:
+        if pool is not None:
+            del dist_matrix, pher, eta, choice_info
+            pool.close()
+
+    return stop.info(iterations, evaluations, stats)
+
+def aco_tsp(n_iter=100, n_ants=30, dist_matrix=None, alpha=1.0, beta=5.0, rho=0.5,
+            candidate_k=None, local_search=False, workers=None,
+            time_limit=None, max_evaluations=None, patience=None, return_info=False,
+            backend="numpy", rng=None, profile=False):
+    """
+    Implementação ACO simples/limpa:
+    - feromônio em matriz completa
+    - probabilidades baseadas em (tau^alpha) * (eta^beta), eta = 1/dist,
+      pré-calculadas numa matriz choice_info a cada iteração
+    - candidate_k (opcional): cada formiga olha só as k vizinhas mais próximas
+    - local_search (opcional): 2-opt + Or-opt no melhor caminho de cada iteração
+    - workers (opcional): constrói as formigas em paralelo num pool de processos,
+      com as matrizes em memória compartilhada; os caminhos são os mesmos da
+      execução sequencial
+    - time_limit / max_evaluations / patience (opcionais): param antes de n_iter;
+      com return_info=True o quarto valor retornado (RunInfo) diz qual disparou
+    - atualização: evaporacao + deposição proporcional a 1/length
+    - backend: 'numpy' ou 'numba' (construção e depósito compilados; resultados
+      idênticos bit a bit para a mesma seed; sem numba instalado usa 'numpy')
+    - rng (opcional): numpy.random.Generator ou seed; sem ele, a seed vem do
+      estado global (np.random.seed). Os sorteios são feitos no processo
+      principal, então o resultado não depende de workers
+    - profile (opcional): acrescenta ao retorno um SolverStats com o tempo
+      acumulado de cada fase (construction, evaluation, local_search,
+      evaporation, deposit, choice_info), tours avaliados e movimentos aceitos
+      pela busca local; desligado, não mede nada
+    - dist_matrix pode ser um DistanceOracle; como o feromônio já ocupa n x n,
+      as distâncias são materializadas numa matriz densa
+    """
+    run = aco_tsp_iter(n_iter, n_ants, dist_matrix, alpha, beta, rho, candidate_k, local_search,
+                       workers, time_limit, max_evaluations, patience, backend, rng, profile)
+    best_path, best_len, history, info = collect(run)
+    result = (best_path, best_len, history)
+    if return_info:
+        result += (info,)
+    if profile:
+        result += (info.stats,)
+    return result
+
+# ---------------------------
+# Ant Colony System (ACS)
+# ---------------------------
+def _nearest_neighbor_length(dist_matrix, start=0):
+    """Comprimento do tour do vizinho mais próximo (usado em tau0 do ACS)."""
+    n = dist_matrix.shape[0]
+    visited = np.zeros(n, dtype=bool)
+    cur, total = start, 0.0
+    visited[cur] = True
+    for _ in range(n - 1):
+        row = np.where(visited, np.inf, dist_matrix[cur])
+        nxt = int(np.argmin(row))
+        total += row[nxt]
+        visited[nxt] = True
+        cur = nxt
+    return total + dist_matrix[cur, start]
+
+def _acs_step(choice_info, cur, visited, q, u, q0):
+    """
+    Regra pseudoaleatória proporcional do ACS: com probabilidade q0 a formiga
+    vai para o argmax de choice_info entre as não visitadas; senão, roleta.
+    """
+    weights = choice_info[cur]
+    weights[visited] = 0.0
+    empty = ~weights.any(axis=1)
+    if empty.any():
+        weights[empty] = ~visited[empty]
+
+    greedy = q < q0
+    nxt = np.argmax(weights, axis=1)
+    explore = ~greedy
+    if explore.any():
+        nxt[explore] = roulette_sample(weights[explore], u[explore])
+    return nxt
+
+def _acs_local_update(pher, choice_info, eta_beta, a, b, xi, tau0):
+    """Atualização local do ACS nas arestas (a, b) recém percorridas (simétrica)."""
+    pher[a, b] = (1.0 - xi) * pher[a, b] + xi * tau0
+    pher[b, a] = pher[a, b]
+    choice_info[a, b] = pher[a, b] * eta_beta[a, b]
+    choice_info[b, a] = choice_info[a, b]
+
+def acs_tsp_iter(n_iter=100, n_ants=10, dist_matrix=None, beta=2.0, rho=0.1, xi=0.1, q0=0.9,
+                 local_search=False, time_limit=None, max_evaluations=None, patience=None,
+                 rng=None):
+    """
+    Versão anytime do acs_tsp: gerador que, a cada iteração, produz
+    (iteração, melhor custo, melhor caminho ou None se não melhorou, tempo decorrido).
+    Ao terminar, retorna o RunInfo (StopIteration.value).
+    """
+    if dist_matrix is None:
+        raise ValueError("dist_matrix não pode ser None")
+    dist_matrix = as_dense(dist_matrix)
+    rng = make_rng(rng)
+
+    n = dist_matrix.shape[0]
+    with np.errstate(divide='ignore'):
+        eta = 1.0 / (dist_matrix + np.eye(n))
+    np.fill_diagonal(eta, 0.0)
+    eta_beta = eta ** beta
+    tau0 = 1.0 / (n * _nearest_neighbor_length(dist_matrix))
+    pher = np.full((n, n), tau0)
+    choice_info = pher * eta_beta
+    if local_search:
+        ls_neighbors = nearest_neighbors(dist_matrix, 10)
 
     best_path = None
     best_len = np.inf
-    history = []
+    stop = StopCriteria(time_limit, max_evaluations, patience)
+    iterations = evaluations = 0
+    ants = np.arange(n_ants)
 
     for it in range(n_iter):
-        all_paths = []
-        all_lengths = []
-
-        for ant in range(n_ants):
-            # caminho construído por probabilidade
-            start = np.random.randint(n)
-            path = [start]
-            while len(path) < n:
-                i = path[-1]
-                unvisited = list(set(range(n)) - set(path))
-                probs = []
-                for j in unvisited:
-                    prob = (pher[i, j] ** alpha) * (eta[i, j] ** beta)
-                    probs.append(prob)
-                probs = np.array(probs)
-                if probs.sum() == 0:
-                    probs = np.ones_like(probs) / len(probs)
-                else:
-                    probs = probs / probs.sum()
-                next_city = np.random.choice(unvisited, p=probs)
-                path.append(next_city)
-
-            L = tour_length(path, dist_matrix)
-            all_paths.append(path)
-            all_lengths.append(L)
-
-        # evaporacao
-        pher *= (1.0 - rho)
-        # depositos
-        for path, L in zip(all_paths, all_lengths):
-            contribution = 1.0 / (L + 1e-12)
-            for i in range(n):
-                a = path[i]
-                b = path[(i+1) % n]
-                pher[a, b] += contribution
-                pher[b, a] += contribution  # simetriza para simplicidade
-
-        # atualiza melhor
-        iter_best_len = min(all_lengths)
-        iter_best_path = all_paths[np.argmin(all_lengths)]
-        if iter_best_len < best_len:
-            best_len = iter_best_len
-            best_path = iter_best_path.copy()
-
-        history.append(best_len)
+        starts = rng.integers(n, size=n_ants)
+        q = rng.random((n - 1, n_ants))
+        u = rng.random((n - 1, n_ants))
+
+        # construção em passo sincronizado, com atualização local após cada passo
+        paths = np.empty((n_ants, n), dtype=np.intp)
+        visited = np.zeros((n_ants, n), dtype=bool)
+        cur = starts
+        paths[:, 0] = cur
+        visited[ants, cur] = True
+        for step in range(1, n):
+            nxt = _acs_step(choice_info, cur, visited, q[step - 1], u[step - 1], q0)
+            _acs_local_update(pher, choice_info, eta_beta, cur, nxt, xi, tau0)
+            cur = nxt
+            paths[:, step] = cur
+            visited[ants, cur] = True
+        _acs_local_update(pher, choice_info, eta_beta, cur, starts, xi, tau0)
+
+        lengths = tour_lengths(paths, dist_matrix)
+        k = int(np.argmin(lengths))
+        if local_search:
+            paths[k] = improve_tour(paths[k], dist_matrix, ls_neighbors)
+            lengths[k] = tour_length(paths[k], dist_matrix)
+
+        improved = lengths[k] < best_len
+        if improved:
+            best_len = lengths[k]
+            best_path = paths[k].copy()
+
+        # atualização global: só as arestas do melhor tour até agora
+        a, b = best_path, np.roll(best_path, -1)
+        pher[a, b] = (1.0 - rho) * pher[a, b] + rho / best_len
+        pher[b, a] = pher[a, b]
+        choice_info[a, b] = pher[a, b] * eta_beta[a, b]
+        choice_info[b, a] = choice_info[a, b]
 
+        iterations += 1
+        evaluations += n_ants
+        yield it, best_len, best_path if improved else None, stop.elapsed()
+        if stop.should_stop(best_len, evaluations):
+            break
+
+    return stop.info(iterations, evaluations)
+
+def acs_tsp(n_iter=100, n_ants=10, dist_matrix=None, beta=2.0, rho=0.1, xi=0.1, q0=0.9,
+            local_search=False, time_limit=None, max_evaluations=None, patience=None,
+            return_info=False, rng=None):
+    """
+    Ant Colony System (variante do aco_tsp):
+    - regra pseudoaleatória proporcional: com probabilidade q0 a formiga segue
+      o argmax de tau * eta^beta (sem sorteio); senão, roleta como no aco_tsp
+    - atualização local durante a construção, puxando o feromônio das arestas
+      usadas para tau0 = 1/(n * L_vizinho_mais_próximo) e diversificando as formigas
+    - só o melhor tour global evapora/deposita (rho), em O(n) por iteração em vez
+      de evaporar a matriz inteira
+    - as formigas andam em passo sincronizado; se duas usam a mesma aresta no
+      mesmo passo, a atualização local é aplicada uma vez
+    - local_search / time_limit / max_evaluations / patience / return_info / rng
+      como no aco_tsp
+    """
+    run = acs_tsp_iter(n_iter, n_ants, dist_matrix, beta, rho, xi, q0, local_search,
+                       time_limit, max_evaluations, patience, rng)
+    best_path, best_len, history, info = collect(run)
+    if return_info:
+        return best_path, best_len, history, info
     return best_path, best_len, history
 
 if __name__ == "__main__":
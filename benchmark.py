@@ -0,0 +1,208 @@
+# -----------------------
+# Benchmarks de desempenho (micro e macro) com baseline em JSON
+# -----------------------
+# python3 benchmark.py run [--saida benchmarks/atual.json] [--repeat R] [--processos P] [--filtro TEXTO]
+# python3 benchmark.py compare [--atual ARQ.json] [--baseline benchmarks/baseline.json]
+#                              [--limiar 0.35] [--limiar-macro 0.5] [--repeat R] [--processos P]
+#                              [--filtro TEXTO]
+#
+# - micro: tour_length, two_opt, um passo da construção ACO e um depósito
+# - macro: aco_tsp e artificial_bee_colony_tsp completos com n = 50, 200 e 1000
+# - instâncias e fluxos aleatórios com seeds fixas; só o solver é cronometrado
+#   (sem plots nem inicialização do interpretador)
+# - a suíte roda em `processos` processos novos, um após o outro: o tempo de um
+#   mesmo benchmark varia bem mais entre processos (até ~1,5x nesta máquina) do
+#   que entre medições do mesmo processo. Cada processo guarda a mediana de
+#   `repeat` medições; o JSON guarda a mediana entre processos e a dispersão
+#   relativa entre eles ((máx - mín) / mediana)
+# - compare mede agora (ou lê --atual) e marca como regressão todo benchmark com
+#   mediana acima de baseline * (1 + limiar), onde o limiar é --limiar (micro) ou
+#   --limiar-macro (solvers completos), alargado para SPREAD_FACTOR vezes a
+#   dispersão do baseline ou da medição atual quando ela for maior; o código de
+#   saída é 1 se houver alguma
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import sys
+import timeit
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from abc_tsp_v2 import artificial_bee_colony_tsp, two_opt
+from aco_tsp import _deposit, _full_scan_step, aco_tsp
+from evaluation import tour_length
+from instances import build_distance_matrix
+
+BENCH_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks")
+BASELINE = os.path.join(BENCH_DIR, "baseline.json")
+MACRO_SIZES = (50, 200, 1000)
+ACO_PARAMS = dict(n_iter=10, n_ants=20, alpha=1.0, beta=5.0, rho=0.5)
+ABC_PARAMS = dict(n_iter=200, n_bees=40, limit=125)
+REPEAT = 7
+PROCESSOS = 3
+SPREAD_FACTOR = 1.0  # limiar mínimo em unidades da dispersão relativa entre processos
+
+def make_instance(n, seed=0):
+    """Instância aleatória fixa (cidades no quadrado unitário) e sua matriz de distâncias."""
+    cities = np.random.default_rng(seed).random((n, 2))
+    return build_distance_matrix(cities)
+
+# ---------------------------
+# Benchmarks: cada função prepara os dados e devolve a chamada a cronometrar
+# ---------------------------
+def bench_tour_length(n=1000):
+    dist_matrix = make_instance(n)
+    path = np.random.default_rng(1).permutation(n)
+    return lambda: tour_length(path, dist_matrix)
+
+def bench_two_opt(n=1000):
+    path = np.random.default_rng(1).permutation(n)
+    rng = np.random.default_rng(2)
+    return lambda: two_opt(path, rng)
+
+def bench_aco_step(n=200, n_ants=30):
+    dist_matrix = make_instance(n)
+    rng = np.random.default_rng(1)
+    choice_info = rng.random((n, n))
+    cur = rng.integers(n, size=n_ants)
+    visited = rng.random((n_ants, n)) < 0.5
+    visited[np.arange(n_ants), cur] = True
+    u = rng.random(n_ants)
+    return lambda: _full_scan_step(choice_info, cur, visited, u)
+
+def bench_deposit(n=200, n_ants=30):
+    rng = np.random.default_rng(1)
+    pher = np.ones((n, n))
+    paths = np.array([rng.permutation(n) for _ in range(n_ants)])
+    lengths = rng.random(n_ants) + n
+    return lambda: _deposit(pher, paths, lengths)
+
+def bench_aco(n):
+    dist_matrix = make_instance(n)
+    return lambda: aco_tsp(dist_matrix=dist_matrix, rng=0, **ACO_PARAMS)
+
+def bench_abc(n):
+    dist_matrix = make_instance(n)
+    return lambda: artificial_bee_colony_tsp(dist_matrix=dist_matrix, rng=0, **ABC_PARAMS)
+
+BENCHMARKS = {
+    "micro/tour_length_n1000": bench_tour_length,
+    "micro/two_opt_n1000": bench_two_opt,
+    "micro/aco_step_n200": bench_aco_step,
+    "micro/deposit_n200": bench_deposit,
+}
+for _n in MACRO_SIZES:
+    BENCHMARKS[f"macro/aco_n{_n}"] = lambda n=_n: bench_aco(n)
+    BENCHMARKS[f"macro/abc_n{_n}"] = lambda n=_n: bench_abc(n)
+
+def measure(setup, repeat=REPEAT):
+    """Mediana do tempo por chamada (s) entre `repeat` medições; o número de chamadas vem do autorange."""
+    timer = timeit.Timer(setup())
+    number, _ = timer.autorange()
+    return float(np.median(timer.repeat(repeat=repeat, number=number))) / number
+
+def measure_all(names, repeat=REPEAT):
+    """Mede os benchmarks `names` no processo atual."""
+    medians = {}
+    for name in names:
+        medians[name] = measure(BENCHMARKS[name], repeat)
+        print(f"{name:28s} {medians[name] * 1e3:12.4f} ms", file=sys.stderr)
+    return medians
+
+def as_measurement(entry):
+    """Resultado de um benchmark no JSON; aceita o formato antigo (só o tempo, sem dispersão)."""
+    if isinstance(entry, dict):
+        return entry
+    return dict(median=entry, spread=0.0)
+
+def run_suite(repeat=REPEAT, filtro=None, processos=PROCESSOS):
+    names = [name for name in BENCHMARKS if not filtro or filtro in name]
+    runs = []
+    spawn = multiprocessing.get_context("spawn")
+    for p in range(processos):
+        print(f"processo {p + 1}/{processos}", file=sys.stderr)
+        with ProcessPoolExecutor(1, mp_context=spawn) as pool:  # um interpretador novo por rodada
+            runs.append(pool.submit(measure_all, names, repeat).result())
+    results = {}
+    for name in names:
+        medians = np.array([run[name] for run in runs])
+        median = float(np.median(medians))
+        results[name] = dict(median=median, spread=float((medians.max() - medians.min()) / median))
+    return dict(meta=dict(python=platform.python_version(), numpy=np.__version__,
+                          machine=platform.machine(), system=platform.system(),
+                          repeat=repeat, processos=processos),
+                results=results)
+
+def compare(current, baseline, limiar, limiar_macro):
+    """Lista (nome, baseline, atual, razão, limiar, regressão?) dos benchmarks presentes nos dois."""
+    rows = []
+    for name, entry in baseline["results"].items():
+        if name not in current["results"]:
+            continue
+        base, cur = as_measurement(entry), as_measurement(current["results"][name])
+        threshold = max(limiar_macro if name.startswith("macro/") else limiar,
+                        SPREAD_FACTOR * max(base["spread"], cur["spread"]))
+        ratio = cur["median"] / base["median"]
+        rows.append((name, base["median"], cur["median"], ratio, threshold, ratio > 1.0 + threshold))
+    return rows
+
+def write_json(data, path):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks de desempenho ABC/ACO")
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    run = sub.add_parser("run", help="mede a suíte e grava o JSON")
+    run.add_argument("--saida", default=os.path.join(BENCH_DIR, "atual.json"))
+
+    cmp = sub.add_parser("compare", help="compara com o baseline e marca regressões")
+    cmp.add_argument("--atual", default=None, help="JSON já medido (sem ele, mede agora)")
+    cmp.add_argument("--baseline", default=BASELINE)
+    cmp.add_argument("--limiar", type=float, default=0.35,
+                     help="regressão quando atual > baseline * (1 + limiar)")
+    cmp.add_argument("--limiar-macro", type=float, default=0.5,
+                     help="limiar dos benchmarks macro (solvers completos)")
+
+    for p in (run, cmp):
+        p.add_argument("--repeat", type=int, default=REPEAT)
+        p.add_argument("--processos", type=int, default=PROCESSOS,
+                       help="processos novos em que a suíte é medida (dispersão entre eles)")
+        p.add_argument("--filtro", default=None, help="só benchmarks cujo nome contém o texto")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.comando == "run":
+        write_json(run_suite(args.repeat, args.filtro, args.processos), args.saida)
+        print(f"Resultados salvos em: {args.saida}")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if args.atual is not None:
+        with open(args.atual) as f:
+            current = json.load(f)
+    else:
+        current = run_suite(args.repeat, args.filtro, args.processos)
+
+    rows = compare(current, baseline, args.limiar, args.limiar_macro)
+    print(f"{'benchmark':28s} {'baseline (ms)':>14s} {'atual (ms)':>12s} {'razão':>7s} {'limiar':>7s}")
+    for name, base, cur, ratio, threshold, slower in rows:
+        flag = "  REGRESSÃO" if slower else ""
+        print(f"{name:28s} {base * 1e3:14.4f} {cur * 1e3:12.4f} {ratio:7.2f} {threshold:7.0%}{flag}")
+    regressions = [row[0] for row in rows if row[5]]
+    if regressions:
+        print(f"{len(regressions)} regressão(ões) acima do limiar: {', '.join(regressions)}")
+        return 1
+    print("Nenhuma regressão acima do limiar.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
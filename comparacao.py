@@ -5,26 +5,45 @@ import time
 
 from abc_tsp_v2 import artificial_bee_colony_tsp
 from aco_tsp import aco_tsp
+from instances import load_distance_matrix
+from tsplib import load_tsplib, percent_gap
 
 # -----------------------
 # Lê parâmetros do terminal
 # -----------------------
-# python3 compara.py <numCidades> <numAbelhas> <numFormigas>
+# python3 compara.py <numCidades | arquivo.tsp> <numAbelhas> <numFormigas>
 if len(sys.argv) < 4:
-    print("Uso: python3 compara.py <numCidades> <numAbelhas> <numFormigas>")
+    print("Uso: python3 compara.py <numCidades | arquivo.tsp> <numAbelhas> <numFormigas>")
     sys.exit(1)
 
-num_cidades = int(sys.argv[1])
 num_abelhas = int(sys.argv[2])
 num_formigas = int(sys.argv[3])
 
 # -----------------------
-# Gera instância TSP
+# Gera (ou carrega da TSPLIB) a instância TSP
 # -----------------------
-np.random.seed(0)
-n_cities = num_cidades
-cities = np.random.rand(n_cities, 2)
-dist_matrix = np.sqrt(((cities[:, None] - cities[None, :])**2).sum(axis=2))
+optimum = None
+if sys.argv[1].endswith(".tsp"):
+    instance = load_tsplib(sys.argv[1])  # cache binário em .cache/tsplib
+    dist_matrix = instance.dist_matrix
+    cities = instance.coords  # None em instâncias EXPLICIT
+    optimum = instance.optimum
+    num_cidades = dist_matrix.shape[0]
+    print(f"Instância {instance.name} ({instance.edge_weight_type}, {num_cidades} cidades), "
+          f"ótimo conhecido: {optimum}")
+else:
+    num_cidades = int(sys.argv[1])
+    np.random.seed(0)
+    n_cities = num_cidades
+    cities = np.random.rand(n_cities, 2)
+    dist_matrix = load_distance_matrix(cities)  # cache .npy compartilhado entre execuções
+
+def format_gap(cost):
+    gap = percent_gap(cost, optimum)
+    return "" if gap is None else f", gap={gap:.2f}%"
+
+# fluxos aleatórios independentes para cada solver (SeedSequence.spawn)
+abc_rng, aco_rng = np.random.default_rng(0).spawn(2)
 
 # -----------------------
 # Parâmetros
@@ -33,7 +52,8 @@ abc_params = dict(
     n_iter=800,
     n_bees=num_abelhas,
     dist_matrix=dist_matrix,
-    limit=125
+    limit=125,
+    rng=abc_rng
 )
 
 aco_params = dict(
@@ -42,7 +62,8 @@ aco_params = dict(
     dist_matrix=dist_matrix,
     alpha=1.0,
     beta=5.0,
-    rho=0.5
+    rho=0.5,
+    rng=aco_rng
 )
 
 # -----------------------
@@ -52,7 +73,7 @@ print("Executando ABC...")
 t0 = time.perf_counter()
 abc_best_path, abc_best_cost, abc_history = artificial_bee_colony_tsp(**abc_params)
 t_abc = time.perf_counter() - t0
-print(f"ABC melhor custo: {abc_best_cost:.6f}")
+print(f"ABC melhor custo: {abc_best_cost:.6f}{format_gap(abc_best_cost)}")
 print(f"Tempo ABC: {t_abc:.4f} segundos")
 
 # -----------------------
@@ -62,7 +83,7 @@ print("Executando ACO...")
 t0 = time.perf_counter()
 aco_best_path, aco_best_cost, aco_history = aco_tsp(**aco_params)
 t_aco = time.perf_counter() - t0
-print(f"ACO melhor custo: {aco_best_cost:.6f}")
+print(f"ACO melhor custo: {aco_best_cost:.6f}{format_gap(aco_best_cost)}")
 print(f"Tempo ACO: {t_aco:.4f} segundos")
 
 # -----------------------
@@ -96,20 +117,21 @@ def plot_tsp_subplot(ax, cities, path, title):
     ax.set_title(title)
     ax.grid(True)
 
-plt.figure(figsize=(10,5))
+if cities is not None:
+    plt.figure(figsize=(10,5))
 
-ax1 = plt.subplot(1,2,1)
-plot_tsp_subplot(ax1, cities, abc_best_path, f"ABC - Melhor Caminho\nCusto = {abc_best_cost:.3f}")
+    ax1 = plt.subplot(1,2,1)
+    plot_tsp_subplot(ax1, cities, abc_best_path, f"ABC - Melhor Caminho\nCusto = {abc_best_cost:.3f}")
 
-ax2 = plt.subplot(1,2,2)
-plot_tsp_subplot(ax2, cities, aco_best_path, f"ACO - Melhor Caminho\nCusto = {aco_best_cost:.3f}")
+    ax2 = plt.subplot(1,2,2)
+    plot_tsp_subplot(ax2, cities, aco_best_path, f"ACO - Melhor Caminho\nCusto = {aco_best_cost:.3f}")
 
-plt.tight_layout()
-plt.show()
+    plt.tight_layout()
+    plt.show()
 
 # -----------------------
 # Resumo
 # -----------------------
 print("Resumo final:")
-print(f" - ABC: custo={abc_best_cost:.6f}, tempo={t_abc:.4f}s, caminho={abc_best_path}")
-print(f" - ACO: custo={aco_best_cost:.6f}, tempo={t_aco:.4f}s, caminho={aco_best_path}")
+print(f" - ABC: custo={abc_best_cost:.6f}{format_gap(abc_best_cost)}, tempo={t_abc:.4f}s, caminho={abc_best_path}")
+print(f" - ACO: custo={aco_best_cost:.6f}{format_gap(aco_best_cost)}, tempo={t_aco:.4f}s, caminho={aco_best_path}")
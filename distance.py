@@ -0,0 +1,52 @@
+import math
+
+import numpy as np
+
+# ---------------------------
+# Oráculo de distâncias euclidianas (sem matriz n x n)
+# ---------------------------
+class DistanceOracle:
+    """
+    Substitui a dist_matrix densa: as distâncias euclidianas são calculadas sob
+    demanda a partir das coordenadas, então a memória cresce com n e não com n².
+    - oracle[i, j]: i e j inteiros ou arrays de índices (broadcast como no NumPy),
+      o que cobre a avaliação em lote dist[P, roll(P, -1)]
+    - oracle[i] / oracle[a:b]: linha(s) completas, calculadas a cada acesso
+    Os valores são idênticos aos de sqrt(((c[:, None] - c[None, :])**2).sum(2)).
+    """
+
+    def __init__(self, cities):
+        self.cities = np.ascontiguousarray(cities, dtype=float)
+        if self.cities.ndim != 2 or self.cities.shape[1] != 2:
+            raise ValueError("cities deve ter shape (n, 2)")
+        n = self.cities.shape[0]
+        self.shape = (n, n)
+        self.dtype = self.cities.dtype
+        self._xy = self.cities.tolist()  # acesso escalar rápido
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __getitem__(self, key):
+        if not isinstance(key, tuple):
+            if isinstance(key, (int, np.integer)):
+                return self.rows([key])[0]
+            return self.rows(key)
+        i, j = key
+        if isinstance(i, (int, np.integer)) and isinstance(j, (int, np.integer)):
+            xi, yi = self._xy[i]
+            xj, yj = self._xy[j]
+            return math.sqrt((xi - xj) ** 2 + (yi - yj) ** 2)
+        diff = self.cities[i] - self.cities[j]
+        return np.sqrt((diff ** 2).sum(axis=-1))
+
+    def rows(self, idx):
+        """Linhas completas para um slice ou array de índices, shape (m, n)."""
+        diff = self.cities[idx][:, None] - self.cities[None, :]
+        return np.sqrt((diff ** 2).sum(axis=2))
+
+def as_dense(dist_matrix):
+    """Matriz densa n x n (materializa o oráculo quando necessário)."""
+    if isinstance(dist_matrix, DistanceOracle):
+        return dist_matrix.rows(slice(None))
+    return dist_matrix
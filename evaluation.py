@@ -0,0 +1,17 @@
+import numpy as np
+
+# ---------------------------
+# Avaliação de tours (compartilhada pelos solvers)
+# ---------------------------
+def tour_length(path, dist_matrix):
+    """Calcula o comprimento do tour (fecha de volta ao início)."""
+    path = np.asarray(path)
+    return dist_matrix[path, np.roll(path, -1)].sum()
+
+def tour_lengths(paths, dist_matrix):
+    """
+    Comprimento de uma população inteira de tours, shape (pop, n), numa única
+    indexação: dist[P, roll(P, -1)].sum(1).
+    """
+    paths = np.asarray(paths)
+    return dist_matrix[paths, np.roll(paths, -1, axis=1)].sum(axis=1)
@@ -0,0 +1,214 @@
+# -----------------------
+# Bateria de testes ABC x ACO num único processo Python
+# (substitui o Testes/executar_testes_escalaveis.sh)
+# -----------------------
+# python3 executar_testes.py [--cidades INI PASSO FIM] [--abelhas INI PASSO FIM]
+#                            [--formigas INI PASSO FIM] [--workers N] [--saida resultados.csv]
+#                            [--store resultados_store] [--seed S]
+#                            [--patience P] [--time-limit SEG] [--tsplib ARQ.tsp ...]
+#
+# - cada instância (seed 0) é gerada uma vez e sua matriz de distâncias fica no
+#   cache .npy compartilhado (instances.load_distance_matrix)
+# - com --tsplib, as instâncias são os arquivos TSPLIB dados (no lugar de
+#   --cidades) e o CSV ganha o nome da instância e o gap (%) até o ótimo conhecido
+# - as execuções ABC/ACO rodam num pool de processos, sem pagar a inicialização
+#   do interpretador, NumPy e matplotlib a cada execução
+# - cada execução de um solver é guardada no ResultStore com a chave
+#   (instância, algoritmo, parâmetros, seed): configurações repetidas (o mesmo
+#   ABC para todos os números de formigas, p.ex.) rodam uma vez só, e uma
+#   bateria interrompida continua de onde parou
+# - por isso um mesmo resultado aparece em várias linhas do CSV: o ABC de
+#   (cidades, abelhas) em todas as linhas com esse número de abelhas e o ACO de
+#   (cidades, formigas) em todas com esse número de formigas. As colunas
+#   ABCReutilizado/ACOReutilizado valem 1 quando a linha repete um resultado
+#   já escrito numa linha anterior; somar TempoABC/TempoACO só das linhas com 0
+#   dá o tempo de computação realmente gasto (as médias não mudam, pois todas
+#   as configurações se repetem o mesmo número de vezes)
+# - as linhas de resultados.csv (mesmo esquema do comparacao.py) saem na ordem
+#   da grade, como no script shell: cada linha é escrita assim que ela e todas
+#   as anteriores estão completas (o arquivo não depende da ordem em que as
+#   execuções terminam), com progresso e ETA no terminal
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from abc_tsp_v2 import artificial_bee_colony_tsp
+from aco_tsp import aco_tsp
+from instances import instance_hash, load_distance_matrix
+from random_streams import task_rng
+from tsplib import load_tsplib, percent_gap
+from result_store import ResultStore, make_key
+
+ALGORITHMS = ("ABC", "ACO")
+CSV_HEADER = ("NumCidades,NumAbelhas,NumFormigas,CustoABC,TempoABC,CustoACO,TempoACO,"
+              "ABCReutilizado,ACOReutilizado\n")
+CSV_HEADER_TSPLIB = ("Instancia,NumCidades,NumAbelhas,NumFormigas,"
+                     "CustoABC,TempoABC,GapABC,CustoACO,TempoACO,GapACO,"
+                     "ABCReutilizado,ACOReutilizado\n")
+
+# mesmos parâmetros do comparacao.py
+ABC_PARAMS = dict(n_iter=800, limit=125)
+ACO_PARAMS = dict(n_iter=800, alpha=1.0, beta=5.0, rho=0.5)
+
+def seq(start, step, stop):
+    """Equivalente ao `seq INÍCIO PASSO FIM` do shell (fim incluso)."""
+    return list(range(start, stop + 1, step))
+
+def make_instance(spec):
+    """
+    Instância de uma linha da bateria: `spec` inteiro é o número de cidades da
+    mesma instância aleatória do comparacao.py (seed 0); texto é um arquivo
+    TSPLIB. Retorna (id da instância, matriz de distâncias, ótimo ou None).
+    """
+    if isinstance(spec, str):
+        instance = load_tsplib(spec)
+        return instance.instance_id, instance.dist_matrix, instance.optimum
+    cities = np.random.RandomState(0).rand(spec, 2)
+    return instance_hash(cities), load_distance_matrix(cities), None
+
+def solver_params(algorithm, num_agentes, stopping=None):
+    """Parâmetros do solver (entram na chave do store); `stopping` só quando usado."""
+    if algorithm == "ABC":
+        params = dict(ABC_PARAMS, n_bees=num_agentes)
+    else:
+        params = dict(ACO_PARAMS, n_ants=num_agentes)
+    params.update(stopping or {})
+    return params
+
+def run_solver(algorithm, spec, num_agentes, seed, stopping=None):
+    """
+    Uma execução de um solver, com um fluxo aleatório próprio derivado de
+    (`seed`, algoritmo, cidades, agentes): o resultado não depende de quantos
+    processos rodam a bateria nem da ordem das execuções.
+    """
+    instance, dist_matrix, _ = make_instance(spec)
+    num_cidades = dist_matrix.shape[0]
+    params = solver_params(algorithm, num_agentes, stopping)
+    solver = artificial_bee_colony_tsp if algorithm == "ABC" else aco_tsp
+
+    rng = task_rng(seed, ALGORITHMS.index(algorithm), num_cidades, num_agentes)
+    t0 = time.perf_counter()
+    _, best_cost, _ = solver(dist_matrix=dist_matrix, rng=rng, **params)
+    elapsed = time.perf_counter() - t0
+
+    return dict(instance=instance, algorithm=algorithm, params=params, seed=seed,
+                n_cities=num_cidades, cost=float(best_cost), time=elapsed)
+
+def format_row(job, abc, aco, reused):
+    num_cidades, num_abelhas, num_formigas = job
+    return (f"{num_cidades},{num_abelhas},{num_formigas},"
+            f"{abc['cost']:.6f},{abc['time']:.4f},{aco['cost']:.6f},{aco['time']:.4f},"
+            f"{reused[0]:d},{reused[1]:d}\n")
+
+def format_row_tsplib(job, abc, aco, reused, optimum):
+    spec, num_abelhas, num_formigas = job
+    name = os.path.splitext(os.path.basename(spec))[0]
+
+    def gap(record):
+        value = percent_gap(record["cost"], optimum)
+        return "" if value is None else f"{value:.4f}"
+
+    return (f"{name},{abc['n_cities']},{num_abelhas},{num_formigas},"
+            f"{abc['cost']:.6f},{abc['time']:.4f},{gap(abc)},"
+            f"{aco['cost']:.6f},{aco['time']:.4f},{gap(aco)},"
+            f"{reused[0]:d},{reused[1]:d}\n")
+
+def format_seconds(seconds):
+    seconds = int(seconds)
+    return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Bateria de testes ABC x ACO em paralelo")
+    parser.add_argument("--cidades", nargs=3, type=int, default=[10, 5, 30], metavar=("INI", "PASSO", "FIM"))
+    parser.add_argument("--abelhas", nargs=3, type=int, default=[10, 10, 90], metavar=("INI", "PASSO", "FIM"))
+    parser.add_argument("--formigas", nargs=3, type=int, default=[10, 10, 90], metavar=("INI", "PASSO", "FIM"))
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--saida", default="resultados.csv")
+    parser.add_argument("--store", default="resultados_store")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--patience", type=int, default=None,
+                        help="para cada execução após P iterações sem melhora")
+    parser.add_argument("--time-limit", type=float, default=None,
+                        help="orçamento de tempo por execução, em segundos")
+    parser.add_argument("--tsplib", nargs="+", default=None, metavar="ARQ.tsp",
+                        help="roda a bateria nestas instâncias TSPLIB em vez de --cidades")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    specs = args.tsplib if args.tsplib else seq(*args.cidades)
+    jobs = [(c, a, f)
+            for c in specs
+            for a in seq(*args.abelhas)
+            for f in seq(*args.formigas)]
+
+    # gera (e grava no cache) cada instância uma única vez antes de distribuir
+    instances = {c: make_instance(c) for c in specs}
+    hashes = {c: instance[0] for c, instance in instances.items()}
+    optima = {c: instance[2] for c, instance in instances.items()}
+    del instances
+
+    stopping = {name: value for name, value in
+                (("patience", args.patience), ("time_limit", args.time_limit)) if value is not None}
+
+    # cada linha do CSV combina uma execução ABC e uma ACO
+    def task_key(task):
+        algorithm, num_cidades, num_agentes = task
+        return make_key(hashes[num_cidades], algorithm, solver_params(algorithm, num_agentes, stopping), args.seed)
+
+    parts = {job: (("ABC", job[0], job[1]), ("ACO", job[0], job[2])) for job in jobs}
+    keys = {task: task_key(task) for pair in parts.values() for task in pair}
+
+    store = ResultStore(args.store)
+    pending = [task for task, key in keys.items() if key not in store]
+    total = len(pending)
+    print(f"Bateria com {len(jobs)} linhas: {len(keys) - total} execuções já no store, "
+          f"{total} a executar em {args.workers} processos...")
+
+    next_row = 0  # índice em `jobs` da próxima linha a escrever
+    emitted = set()  # chaves de execuções já escritas em alguma linha do CSV
+    t_start = time.perf_counter()
+    with open(args.saida, "w") as out, ProcessPoolExecutor(args.workers) as pool:
+        out.write(CSV_HEADER_TSPLIB if args.tsplib else CSV_HEADER)
+
+        def write_ready_rows():
+            nonlocal next_row
+            while next_row < len(jobs):
+                job = jobs[next_row]
+                abc_task, aco_task = parts[job]
+                if keys[abc_task] not in store or keys[aco_task] not in store:
+                    break
+                abc, aco = store.get(keys[abc_task]), store.get(keys[aco_task])
+                reused = (keys[abc_task] in emitted, keys[aco_task] in emitted)
+                emitted.update((keys[abc_task], keys[aco_task]))
+                if args.tsplib:
+                    out.write(format_row_tsplib(job, abc, aco, reused, optima[job[0]]))
+                else:
+                    out.write(format_row(job, abc, aco, reused))
+                next_row += 1
+            out.flush()
+
+        write_ready_rows()
+        futures = {pool.submit(run_solver, *task, args.seed, stopping): task for task in pending}
+        for done, future in enumerate(as_completed(futures), start=1):
+            record = future.result()
+            store.append([record])
+            write_ready_rows()
+
+            elapsed = time.perf_counter() - t_start
+            eta = elapsed / done * (total - done)
+            algorithm, num_cidades, num_agentes = futures[future]
+            print(f"[{done}/{total}] {algorithm}: Cidades={num_cidades}, Agentes={num_agentes} | "
+                  f"custo={record['cost']:.6f} | "
+                  f"decorrido {format_seconds(elapsed)} | ETA {format_seconds(eta)}",
+                  file=sys.stderr)
+
+    store.compact()
+    print(f"Bateria concluída. Resultados salvos em: {args.saida} (store: {args.store})")
+
+if __name__ == "__main__":
+    main()
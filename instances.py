@@ -0,0 +1,56 @@
+import hashlib
+import os
+
+import numpy as np
+
+# ---------------------------
+# Instâncias TSP e cache de matrizes de distância
+# ---------------------------
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "distancias")
+
+def instance_hash(cities):
+    """Hash estável das coordenadas (identifica a instância no cache)."""
+    cities = np.ascontiguousarray(cities, dtype=np.float64)
+    h = hashlib.sha1()
+    h.update(str(cities.shape).encode())
+    h.update(cities.tobytes())
+    return h.hexdigest()[:16]
+
+def build_distance_matrix(cities, dtype=np.float64, block_rows=1024, out=None):
+    """
+    Matriz de distâncias euclidianas construída em blocos de linhas, para não
+    criar o temporário n x n x 2 de uma vez. `out` pode ser um memmap já aberto.
+    Em float64 o resultado é idêntico ao broadcast completo.
+    """
+    cities = np.asarray(cities, dtype=np.float64)
+    n = cities.shape[0]
+    if out is None:
+        out = np.empty((n, n), dtype=dtype)
+    for start in range(0, n, block_rows):
+        stop = min(start + block_rows, n)
+        diff = cities[start:stop, None] - cities[None, :]
+        out[start:stop] = np.sqrt((diff ** 2).sum(axis=2))
+    return out
+
+def load_distance_matrix(cities, dtype=np.float64, cache_dir=CACHE_DIR, block_rows=1024):
+    """
+    Matriz de distâncias via cache em disco:
+    - arquivo .npy com nome <hash da instância>_<dtype>.npy
+    - na primeira vez é escrita em blocos direto no arquivo (open_memmap)
+    - depois é reaberta com np.load(mmap_mode='r'), compartilhando o page cache
+      entre processos em vez de recalcular
+    """
+    dtype = np.dtype(dtype)
+    os.makedirs(cache_dir, exist_ok=True)
+    path = os.path.join(cache_dir, f"{instance_hash(cities)}_{dtype.name}.npy")
+    if not os.path.exists(path):
+        n = len(cities)
+        # escreve num arquivo temporário e renomeia: processos concorrentes
+        # nunca enxergam um .npy pela metade
+        tmp = f"{path}.{os.getpid()}.tmp"
+        out = np.lib.format.open_memmap(tmp, mode="w+", dtype=dtype, shape=(n, n))
+        build_distance_matrix(cities, dtype, block_rows, out=out)
+        out.flush()
+        del out
+        os.replace(tmp, path)
+    return np.load(path, mmap_mode="r")
@@ -0,0 +1,172 @@
+import importlib.util
+import warnings
+
+import numpy as np
+
+# ---------------------------
+# Kernels compilados com Numba (backend='numba')
+# ---------------------------
+# Cada kernel repete exatamente a aritmética da versão NumPy correspondente
+# (mesma ordem de somas e comparações) e recebe os sorteios já feitos, então
+# os dois backends produzem resultados idênticos bit a bit para a mesma seed.
+#
+# numba é opcional e só é importado quando o backend 'numba' é pedido pela
+# primeira vez (resolve_backend): com backend='numpy' nenhum processo paga a
+# importação (~0,2 s). Até lá as funções abaixo são Python puro; na primeira
+# vez elas são substituídas no módulo pelas versões njit.
+BACKENDS = ("numpy", "numba")
+HAVE_NUMBA = importlib.util.find_spec("numba") is not None  # instalado (sem importar)
+_KERNELS = ("_roulette", "construct_from_draws", "deposit", "two_opt_moves", "adjacent_swap_moves")
+_compiled = False
+
+def _compile():
+    """Importa numba e troca os kernels pelas versões njit; False se a importação falhar."""
+    global HAVE_NUMBA, _compiled
+    if not _compiled and HAVE_NUMBA:
+        try:
+            import numba
+        except ImportError:
+            HAVE_NUMBA = False
+            return False
+        namespace = globals()
+        for name in _KERNELS:
+            namespace[name] = numba.njit(cache=True)(namespace[name])
+        _compiled = True
+    return _compiled
+
+def resolve_backend(backend):
+    """Valida o backend pedido; 'numba' sem o pacote instalado cai para 'numpy'."""
+    if backend not in BACKENDS:
+        raise ValueError(f"backend deve ser um de {BACKENDS}")
+    if backend == "numba" and not _compile():
+        warnings.warn("numba não está instalado; usando o backend numpy", RuntimeWarning)
+        return "numpy"
+    return backend
+
+
+def _roulette(weights, count, u):
+    """Mesmo sorteio do aco_tsp.roulette_sample para uma única linha."""
+    total = 0.0
+    for k in range(count):
+        total += weights[k]
+    target = min(u * total, np.nextafter(total, 0.0))
+    acc = 0.0
+    for k in range(count):
+        acc += weights[k]
+        if acc > target:
+            return k
+    return count
+
+def construct_from_draws(choice_info, starts, u, candidates):
+    """
+    Versão compilada do aco_tsp._construct_from_draws; `candidates` com
+    zero colunas significa varredura completa.
+    """
+    n = choice_info.shape[0]
+    n_ants = starts.shape[0]
+    k = candidates.shape[1]
+    paths = np.empty((n_ants, n), dtype=np.intp)
+    visited = np.zeros(n, dtype=np.bool_)
+    weights = np.empty(n)
+
+    for ant in range(n_ants):
+        visited[:] = False
+        cur = starts[ant]
+        paths[ant, 0] = cur
+        visited[cur] = True
+
+        for step in range(1, n):
+            uu = u[step - 1, ant]
+            nxt = -1
+            if k > 0:
+                has_cand = False
+                has_weight = False
+                for j in range(k):
+                    c = candidates[cur, j]
+                    if visited[c]:
+                        weights[j] = 0.0
+                    else:
+                        has_cand = True
+                        weights[j] = choice_info[cur, c]
+                        if weights[j] != 0.0:
+                            has_weight = True
+                if has_cand:
+                    if not has_weight:
+                        for j in range(k):
+                            weights[j] = 0.0 if visited[candidates[cur, j]] else 1.0
+                    nxt = candidates[cur, _roulette(weights, k, uu)]
+
+            if nxt < 0:
+                has_weight = False
+                for j in range(n):
+                    if visited[j]:
+                        weights[j] = 0.0
+                    else:
+                        weights[j] = choice_info[cur, j]
+                        if weights[j] != 0.0:
+                            has_weight = True
+                if not has_weight:
+                    for j in range(n):
+                        weights[j] = 0.0 if visited[j] else 1.0
+                nxt = _roulette(weights, n, uu)
+
+            cur = nxt
+            paths[ant, step] = cur
+            visited[cur] = True
+
+    return paths
+
+def deposit(pher, paths, lengths):
+    """Versão compilada do depósito de feromônio do aco_tsp."""
+    n_ants, n = paths.shape
+    for ant in range(n_ants):
+        contribution = 1.0 / (lengths[ant] + 1e-12)
+        for i in range(n):
+            a = paths[ant, i]
+            b = paths[ant, (i + 1) % n]
+            pher[a, b] += contribution
+            pher[b, a] += contribution
+
+def two_opt_moves(bees, fitness, trial, targets, lo, hi, dist_matrix):
+    """Versão compilada do abc_tsp_v2._two_opt_moves."""
+    n = bees.shape[1]
+    accepted = 0
+    for m in range(targets.shape[0]):
+        i = targets[m]
+        i_lo = lo[m]
+        i_hi = hi[m]
+        a = bees[i, i_lo - 1]
+        b = bees[i, i_lo]
+        c = bees[i, i_hi - 1]
+        d = bees[i, i_hi % n]
+        delta = dist_matrix[a, c] + dist_matrix[b, d] - dist_matrix[a, b] - dist_matrix[c, d]
+        if delta < 0:
+            x = i_lo
+            y = i_hi - 1
+            while x < y:
+                tmp = bees[i, x]
+                bees[i, x] = bees[i, y]
+                bees[i, y] = tmp
+                x += 1
+                y -= 1
+            fitness[i] += delta
+            trial[i] = 0
+            accepted += 1
+        else:
+            trial[i] += 1
+    return accepted
+
+def adjacent_swap_moves(bees, positions, dist_matrix):
+    """Versão compilada do abc_tsp_v1._adjacent_swap_moves."""
+    n = bees.shape[1]
+    for i in range(bees.shape[0]):
+        a = positions[i]
+        b = (a + 1) % n
+        prev = bees[i, a - 1]
+        x = bees[i, a]
+        y = bees[i, b]
+        nxt = bees[i, (b + 1) % n]
+        delta = dist_matrix[prev, y] + dist_matrix[x, nxt] - dist_matrix[prev, x] - dist_matrix[y, nxt]
+        if delta < 0:
+            bees[i, a] = y
+            bees[i, b] = x
@@ -0,0 +1,152 @@
+from collections import deque
+
+import numpy as np
+
+# ---------------------------
+# Busca local para TSP (2-opt + Or-opt)
+# ---------------------------
+EPS = 1e-12
+
+def nearest_neighbors(dist_matrix, k, block_rows=1024):
+    """
+    Lista de candidatas: as k cidades mais próximas de cada cidade, em ordem
+    crescente. Processa a matriz (ou o DistanceOracle) em blocos de linhas.
+    """
+    n = dist_matrix.shape[0]
+    k = min(k, n - 1)
+    nn = np.empty((n, k), dtype=np.intp)
+    for start in range(0, n, block_rows):
+        stop = min(start + block_rows, n)
+        d = np.array(dist_matrix[start:stop], dtype=float)
+        d[np.arange(stop - start), np.arange(start, stop)] = np.inf  # a própria cidade nunca é candidata
+        part = np.argpartition(d, k - 1, axis=1)[:, :k]
+        order = np.argsort(np.take_along_axis(d, part, axis=1), axis=1)
+        nn[start:stop] = np.take_along_axis(part, order, axis=1)
+    return nn
+
+def _reverse(path, pos, i, j):
+    """Inverte o trecho cíclico path[i..j] (inclusive), mexendo no lado mais curto."""
+    n = len(path)
+    size = (j - i) % n + 1
+    if 2 * size > n:
+        # inverter o complemento gera o mesmo ciclo (percorrido ao contrário)
+        i, size = (j + 1) % n, n - size
+    if size < 2:
+        return
+    idx = (i + np.arange(size)) % n
+    path[idx] = path[idx[::-1]]
+    pos[path[idx]] = idx
+
+def _two_opt_move(a, path, pos, dist, neighbors):
+    """
+    Procura uma troca 2-opt que melhore o tour usando as arestas de `a`.
+    Retorna as cidades cujas arestas mudaram, ou None.
+    """
+    n = len(path)
+    for succ in (True, False):
+        step = 1 if succ else -1
+        b = path[(pos[a] + step) % n]
+        d_ab = dist[a, b]
+        for c in neighbors[a]:
+            g1 = d_ab - dist[a, c]
+            if g1 <= EPS:
+                break  # vizinhos ordenados: os próximos só pioram
+            d = path[(pos[c] + step) % n]
+            if c == b or d == a:
+                continue
+            gain = g1 + dist[c, d] - dist[b, d]
+            if gain > EPS:
+                if succ:
+                    _reverse(path, pos, pos[b], pos[c])   # a b ... c d -> a c ... b d
+                else:
+                    _reverse(path, pos, pos[a], pos[d])   # b a ... d c -> b d ... a c
+                return (a, b, c, d)
+    return None
+
+def _or_opt_move(a, path, pos, dist, neighbors, max_segment=3):
+    """
+    Procura um movimento Or-opt que melhore o tour: um trecho de 1 a
+    `max_segment` cidades com ponta em `a` é reinserido (na orientação que
+    couber) entre duas cidades consecutivas, deixando `a` ao lado de uma vizinha.
+    Retorna as cidades cujas arestas mudaram, ou None.
+    """
+    n = len(path)
+    for length in range(1, max_segment + 1):
+        if length + 3 > n:
+            break
+        for forward in (True, False):
+            # trecho s1..s2 no sentido do tour; `a` é uma das pontas
+            if forward:
+                first = pos[a]
+            else:
+                first = (pos[a] - length + 1) % n
+            s1 = path[first]
+            s2 = path[(first + length - 1) % n]
+            p = path[(first - 1) % n]
+            nx = path[(first + length) % n]
+            other = s2 if a == s1 else s1
+            g_rm = dist[p, s1] + dist[s2, nx] - dist[p, nx]
+            seg_idx = (first + np.arange(length)) % n
+            in_seg = set(path[seg_idx].tolist())
+
+            for c in neighbors[a]:
+                g1 = g_rm - dist[a, c]
+                if g1 <= EPS:
+                    break
+                if c in in_seg:
+                    continue
+                for x, y in ((c, path[(pos[c] + 1) % n]), (path[(pos[c] - 1) % n], c)):
+                    if x in in_seg or y in in_seg:
+                        continue
+                    far = y if c == x else x
+                    gain = g1 - dist[far, other] + dist[x, y]
+                    if gain > EPS:
+                        # x fica colado em `a` (c == x) ou na outra ponta (c == y)
+                        next_to_x = a if c == x else other
+                        seg = path[seg_idx]
+                        if next_to_x != s1:
+                            seg = seg[::-1]
+                        rest = np.delete(path, seg_idx)
+                        k = int(np.flatnonzero(rest == x)[0])
+                        path[:] = np.concatenate([rest[:k + 1], seg, rest[k + 1:]])
+                        pos[path] = np.arange(n)
+                        return (p, nx, s1, s2, x, y)
+    return None
+
+def improve_tour(path, dist_matrix, neighbors, stats=None):
+    """
+    Busca local determinística até um ótimo local de 2-opt + Or-opt:
+    - só avalia movimentos que ligam uma cidade a uma das suas vizinhas
+      próximas (`neighbors`, ver nearest_neighbors)
+    - don't-look bits: uma cidade só volta a ser examinada quando uma das
+      suas arestas muda
+    Retorna um novo array com o tour melhorado. Com `stats` (SolverStats),
+    soma os movimentos aceitos em stats.accepted_moves.
+    """
+    path = np.array(path, dtype=np.intp)
+    n = len(path)
+    if n < 5:
+        return path
+
+    pos = np.empty(n, dtype=np.intp)
+    pos[path] = np.arange(n)
+    nbrs = np.asarray(neighbors).tolist()
+
+    queue = deque(path.tolist())
+    queued = np.ones(n, dtype=bool)  # don't-look bit desligado
+    while queue:
+        a = queue.popleft()
+        queued[a] = False
+        touched = _two_opt_move(a, path, pos, dist_matrix, nbrs)
+        if touched is None:
+            touched = _or_opt_move(a, path, pos, dist_matrix, nbrs)
+        if touched is None:
+            continue
+        if stats is not None:
+            stats.accepted_moves += 1
+        for city in touched:
+            if not queued[city]:
+                queued[city] = True
+                queue.append(int(city))
+
+    return path
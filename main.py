@@ -1,19 +1,155 @@
+# -----------------------
+# Ponto de entrada de linha de comando (sem interface gráfica por padrão)
+# -----------------------
+# python3 main.py solve {abc,aco,acs} (--cidades N | --tsplib ARQ.tsp) [--agentes K]
+#                 [--n-iter I] [--seed S] [--backend numpy|numba] [--local-search]
+#                 [--time-limit SEG] [--patience P] [--caminho] [--plot DIR]
+# python3 main.py compare (--cidades N | --tsplib ARQ.tsp) [--abelhas A] [--formigas F]
+#                 [...mesmas opções...]
+#
+# - imprime o resultado em JSON no stdout (custo, tempo, gap até o ótimo,
+#   critério de parada e, com --caminho, o melhor tour)
+# - matplotlib só é importado com --plot, sempre com o backend Agg: as figuras
+#   são salvas em DIR, sem abrir janela nem carregar plugins de interface
+# - numba também só é importado com --backend numba (kernels.resolve_backend):
+#   com o backend numpy a partida carrega apenas numpy e os solvers
+# - mesma instância aleatória (seed 0) e parâmetros do comparacao.py
+import argparse
+import json
+import os
 import sys
+import time
 
-# sys.argv é uma lista com os argumentos passados pelo terminal
-# argv[0] = nome do arquivo (main.py)
-# argv[1] = primeiro argumento
-# argv[2] = segundo argumento
+import numpy as np
 
-if len(sys.argv) < 3:
-    print("Uso: python3 main.py num1 num2")
-    sys.exit(1)
+from abc_tsp_v2 import artificial_bee_colony_tsp
+from aco_tsp import aco_tsp, acs_tsp
+from executar_testes import ABC_PARAMS, ACO_PARAMS, make_instance
+from tsplib import load_tsplib, percent_gap
 
-# Captura e converte para inteiro
-a = int(sys.argv[1])
-b = int(sys.argv[2])
+SOLVERS = {
+    "abc": (artificial_bee_colony_tsp, ABC_PARAMS, "n_bees"),
+    "aco": (aco_tsp, ACO_PARAMS, "n_ants"),
+    "acs": (acs_tsp, dict(n_iter=ACO_PARAMS["n_iter"]), "n_ants"),
+}
 
-# Operação desejada
-resultado = a + b
+def load_instance(args):
+    """(nome, matriz de distâncias, coordenadas ou None, ótimo ou None) da instância pedida."""
+    if args.tsplib:
+        instance = load_tsplib(args.tsplib)
+        return instance.name, instance.dist_matrix, instance.coords, instance.optimum
+    _, dist_matrix, _ = make_instance(args.cidades)
+    cities = np.random.RandomState(0).rand(args.cidades, 2)
+    return f"aleatoria_{args.cidades}", dist_matrix, cities, None
 
-print(resultado)
+def run(algorithm, num_agentes, dist_matrix, optimum, args, rng):
+    solver, defaults, agents_param = SOLVERS[algorithm]
+    params = dict(defaults, **{agents_param: num_agentes})
+    if args.n_iter is not None:
+        params["n_iter"] = args.n_iter
+    for name in ("time_limit", "patience"):
+        if getattr(args, name) is not None:
+            params[name] = getattr(args, name)
+    if args.local_search:
+        params["local_search"] = True
+    if args.backend != "numpy" and algorithm != "acs":
+        params["backend"] = args.backend
+
+    t0 = time.perf_counter()
+    best_path, best_cost, history, info = solver(dist_matrix=dist_matrix, rng=rng, return_info=True,
+                                                 **params)
+    elapsed = time.perf_counter() - t0
+
+    result = dict(algorithm=algorithm.upper(), agents=num_agentes, cost=float(best_cost),
+                  time=elapsed, gap=percent_gap(float(best_cost), optimum),
+                  stop_reason=info.stop_reason, iterations=info.iterations,
+                  evaluations=info.evaluations)
+    if args.caminho:
+        result["path"] = [int(c) for c in best_path]
+    return result, best_path, history
+
+def save_plots(directory, name, cities, runs):
+    """Convergência e melhores caminhos em PNG, com o backend Agg (sem janela)."""
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    os.makedirs(directory, exist_ok=True)
+    files = []
+
+    fig, axes = plt.subplots(1, len(runs), figsize=(5 * len(runs), 4), squeeze=False)
+    for ax, (result, _, history) in zip(axes[0], runs):
+        ax.plot(history)
+        ax.set_title(f"{result['algorithm']} - Convergência")
+        ax.set_xlabel("Iteração")
+        ax.set_ylabel("Melhor custo")
+        ax.grid(True)
+    fig.tight_layout()
+    files.append(os.path.join(directory, f"convergencia_{name}.png"))
+    fig.savefig(files[-1])
+    plt.close(fig)
+
+    if cities is not None:
+        fig, axes = plt.subplots(1, len(runs), figsize=(5 * len(runs), 5), squeeze=False)
+        for ax, (result, path, _) in zip(axes[0], runs):
+            xs, ys = cities[path, 0], cities[path, 1]
+            ax.plot(np.append(xs, xs[0]), np.append(ys, ys[0]), marker='o')
+            ax.set_aspect('equal')
+            ax.set_title(f"{result['algorithm']} - Melhor Caminho\nCusto = {result['cost']:.3f}")
+            ax.grid(True)
+        fig.tight_layout()
+        files.append(os.path.join(directory, f"caminhos_{name}.png"))
+        fig.savefig(files[-1])
+        plt.close(fig)
+    return files
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="ABC x ACO para o TSP (saída em JSON)")
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    solve = sub.add_parser("solve", help="roda um solver")
+    solve.add_argument("algoritmo", choices=sorted(SOLVERS))
+    solve.add_argument("--agentes", type=int, default=30, help="abelhas ou formigas")
+
+    compare = sub.add_parser("compare", help="roda ABC e ACO na mesma instância")
+    compare.add_argument("--abelhas", type=int, default=30)
+    compare.add_argument("--formigas", type=int, default=30)
+
+    for p in (solve, compare):
+        instance = p.add_mutually_exclusive_group(required=True)
+        instance.add_argument("--cidades", type=int, help="instância aleatória (seed 0) com N cidades")
+        instance.add_argument("--tsplib", help="arquivo .tsp da TSPLIB")
+        p.add_argument("--n-iter", type=int, default=None)
+        p.add_argument("--seed", type=int, default=0)
+        p.add_argument("--backend", choices=("numpy", "numba"), default="numpy")
+        p.add_argument("--local-search", action="store_true")
+        p.add_argument("--time-limit", type=float, default=None)
+        p.add_argument("--patience", type=int, default=None)
+        p.add_argument("--caminho", action="store_true", help="inclui o melhor tour no JSON")
+        p.add_argument("--plot", metavar="DIR", default=None,
+                       help="salva os gráficos em DIR (padrão: sem gráficos)")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    name, dist_matrix, cities, optimum = load_instance(args)
+
+    if args.comando == "solve":
+        tasks = [(args.algoritmo, args.agentes)]
+    else:
+        tasks = [("abc", args.abelhas), ("aco", args.formigas)]
+    # um fluxo aleatório independente por solver (SeedSequence.spawn)
+    rngs = np.random.default_rng(args.seed).spawn(len(tasks))
+    runs = [run(algorithm, agents, dist_matrix, optimum, args, rng)
+            for (algorithm, agents), rng in zip(tasks, rngs)]
+
+    output = dict(instance=name, n_cities=int(dist_matrix.shape[0]), optimum=optimum,
+                  seed=args.seed, results=[result for result, _, _ in runs])
+    if args.plot:
+        output["plots"] = save_plots(args.plot, name, cities, runs)
+    json.dump(output, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,27 @@
+import numpy as np
+
+# ---------------------------
+# Fluxos aleatórios explícitos (numpy.random.Generator)
+# ---------------------------
+def make_rng(rng=None):
+    """
+    Normaliza o parâmetro `rng` dos solvers para um numpy.random.Generator:
+    - Generator: usado como está (o chamador controla o fluxo)
+    - int ou SeedSequence: semente de um Generator novo
+    - None: semente tirada do estado global legado, então np.random.seed()
+      continua tornando as execuções reproduzíveis
+    """
+    if isinstance(rng, np.random.Generator):
+        return rng
+    if rng is None:
+        rng = np.random.randint(2**63 - 1, dtype=np.int64)
+    return np.random.default_rng(rng)
+
+def task_rng(seed, *key):
+    """
+    Generator de uma tarefa de bateria: SeedSequence(seed) com spawn_key=key,
+    o mesmo filho que SeedSequence.spawn daria para esse caminho. Como depende
+    só de (seed, chave da tarefa), o resultado não muda com o número de
+    processos nem com a ordem de execução.
+    """
+    return np.random.default_rng(np.random.SeedSequence(seed, spawn_key=tuple(int(k) for k in key)))
@@ -0,0 +1,102 @@
+import glob
+import hashlib
+import json
+import os
+import time
+
+import numpy as np
+
+# ---------------------------
+# Armazenamento de resultados (colunar, em blocos .npz)
+# ---------------------------
+COLUMNS = ("key", "instance", "algorithm", "params", "seed", "n_cities", "cost", "time")
+
+def make_key(instance, algorithm, params, seed):
+    """Chave de conteúdo de uma execução: (hash da instância, algoritmo, parâmetros, seed)."""
+    payload = json.dumps([instance, algorithm, params, seed], sort_keys=True)
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+class ResultStore:
+    """
+    Resultados de execuções guardados por chave de conteúdo (make_key):
+    - cada append grava um novo bloco .npz no diretório (escrita atômica), então
+      uma bateria interrompida não perde o que já terminou
+    - `key in store` permite pular execuções já feitas e retomar a bateria
+    - query() filtra as colunas em memória, sem reprocessar texto
+    - compact() junta os blocos num único arquivo
+    """
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self._columns = {name: [] for name in COLUMNS}
+        self._index = {}
+        self._counter = 0
+        for chunk in sorted(glob.glob(os.path.join(path, "*.npz"))):
+            with np.load(chunk) as data:
+                self._add({name: data[name].tolist() for name in COLUMNS})
+
+    def _add(self, columns):
+        for key_index, key in enumerate(columns["key"]):
+            if key in self._index:
+                continue
+            self._index[key] = len(self._index)
+            for name in COLUMNS:
+                self._columns[name].append(columns[name][key_index])
+
+    def __contains__(self, key):
+        return key in self._index
+
+    def __len__(self):
+        return len(self._index)
+
+    def append(self, records):
+        """Grava uma lista de registros (dicts com as colunas de COLUMNS, exceto `key`)."""
+        records = [dict(r, key=r.get("key") or make_key(r["instance"], r["algorithm"], r["params"], r["seed"]))
+                   for r in records]
+        records = [r for r in records if r["key"] not in self._index]
+        if not records:
+            return
+        columns = {name: [r[name] for r in records] for name in COLUMNS}
+        columns["params"] = [p if isinstance(p, str) else json.dumps(p, sort_keys=True) for p in columns["params"]]
+        self._write_chunk(columns)
+        self._add(columns)
+
+    def _write_chunk(self, columns, name=None):
+        self._counter += 1
+        if name is None:
+            name = f"bloco_{time.time_ns()}_{os.getpid()}_{self._counter}"
+        final = os.path.join(self.path, name + ".npz")
+        tmp = os.path.join(self.path, name + ".tmp")
+        with open(tmp, "wb") as f:
+            np.savez(f, **{k: np.asarray(v) for k, v in columns.items()})
+        os.replace(tmp, final)
+        return final
+
+    def columns(self):
+        """Todas as colunas como arrays NumPy."""
+        return {name: np.asarray(values) for name, values in self._columns.items()}
+
+    def query(self, **filters):
+        """Colunas filtradas por igualdade, p.ex. query(algorithm="ABC", n_cities=20)."""
+        cols = self.columns()
+        mask = np.ones(len(self), dtype=bool)
+        for name, value in filters.items():
+            mask &= cols[name] == value
+        return {name: values[mask] for name, values in cols.items()}
+
+    def get(self, key):
+        """Registro (dict) de uma chave, ou None."""
+        i = self._index.get(key)
+        if i is None:
+            return None
+        return {name: self._columns[name][i] for name in COLUMNS}
+
+    def compact(self):
+        """Junta todos os blocos num só arquivo."""
+        old = glob.glob(os.path.join(self.path, "*.npz"))
+        if len(old) <= 1:
+            return
+        self._write_chunk(self._columns, name=f"compacto_{time.time_ns()}")
+        for chunk in old:
+            os.remove(chunk)
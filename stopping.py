@@ -0,0 +1,101 @@
+import time
+from dataclasses import dataclass, field
+
+import numpy as np
+
+# ---------------------------
+# Estatísticas por fase (profile=True)
+# ---------------------------
+@dataclass
+class SolverStats:
+    """
+    Tempo acumulado (perf_counter) por fase do solver, tours avaliados e
+    movimentos aceitos. O solver chama start() no início de cada iteração e
+    mark(fase) ao fim de cada fase; com profile=False nada disso é criado.
+    """
+    phase_times: dict = field(default_factory=dict)
+    evaluations: int = 0
+    accepted_moves: int = 0
+    _last: float = field(default=0.0, repr=False)
+
+    def start(self):
+        self._last = time.perf_counter()
+
+    def mark(self, phase):
+        now = time.perf_counter()
+        self.phase_times[phase] = self.phase_times.get(phase, 0.0) + (now - self._last)
+        self._last = now
+
+# ---------------------------
+# Critérios de parada compartilhados pelos solvers
+# ---------------------------
+@dataclass
+class RunInfo:
+    """
+    Resumo de uma execução: qual critério parou o solver e quanto ele gastou;
+    `stats` traz o SolverStats quando o solver roda com profile=True.
+    """
+    stop_reason: str
+    iterations: int
+    evaluations: int
+    elapsed: float
+    stats: SolverStats = None
+
+class StopCriteria:
+    """
+    Critérios de parada além do n_iter fixo (todos opcionais):
+    - time_limit: orçamento de tempo de relógio, em segundos
+    - max_evaluations: número máximo de tours avaliados
+    - patience: para após `patience` iterações seguidas sem melhora do melhor custo
+    O primeiro critério atingido fica em `reason`; se nenhum disparar, "n_iter".
+    """
+
+    def __init__(self, time_limit=None, max_evaluations=None, patience=None):
+        self.time_limit = time_limit
+        self.max_evaluations = max_evaluations
+        self.patience = patience
+        self.reason = "n_iter"
+        self.t0 = time.perf_counter()
+        self._best = np.inf
+        self._stall = 0
+
+    def elapsed(self):
+        return time.perf_counter() - self.t0
+
+    def should_stop(self, best, evaluations):
+        """Chamado ao fim de cada iteração com o melhor custo e o total de avaliações."""
+        if best < self._best:
+            self._best = best
+            self._stall = 0
+        else:
+            self._stall += 1
+
+        if self.patience is not None and self._stall >= self.patience:
+            self.reason = "patience"
+        elif self.max_evaluations is not None and evaluations >= self.max_evaluations:
+            self.reason = "max_evaluations"
+        elif self.time_limit is not None and self.elapsed() >= self.time_limit:
+            self.reason = "time_limit"
+        else:
+            return False
+        return True
+
+    def info(self, iterations, evaluations, stats=None):
+        if stats is not None:
+            stats.evaluations = evaluations
+        return RunInfo(self.reason, iterations, evaluations, self.elapsed(), stats)
+
+def collect(run):
+    """
+    Consome um gerador anytime (aco_tsp_iter, artificial_bee_colony_tsp_iter)
+    e devolve (melhor caminho, melhor custo, history, RunInfo).
+    """
+    best_path, best_len, history = None, np.inf, []
+    while True:
+        try:
+            _, best_len, path, _ = next(run)
+        except StopIteration as done:
+            return best_path, best_len, history, done.value
+        history.append(best_len)
+        if path is not None:
+            best_path = path
@@ -0,0 +1,267 @@
+import hashlib
+import itertools
+import os
+from dataclasses import dataclass
+
+import numpy as np
+
+from evaluation import tour_length
+from instances import CACHE_DIR
+
+# ---------------------------
+# Instâncias TSPLIB (.tsp / .opt.tour)
+# ---------------------------
+TSPLIB_CACHE_DIR = os.path.join(os.path.dirname(CACHE_DIR), "tsplib")
+EDGE_WEIGHT_TYPES = ("EUC_2D", "CEIL_2D", "GEO", "ATT", "EXPLICIT")
+
+# ótimos publicados na TSPLIB, usados quando não há um .opt.tour ao lado do .tsp
+KNOWN_OPTIMA = {
+    "att48": 10628, "berlin52": 7542, "eil51": 426, "eil76": 538, "eil101": 629,
+    "kroA100": 21282, "st70": 675, "pr76": 108159, "rat99": 1211, "lin105": 14379,
+    "ch130": 6110, "ch150": 6528, "a280": 2579, "pcb442": 50778,
+    "ulysses16": 6859, "ulysses22": 7013, "gr96": 55209,
+}
+
+@dataclass
+class TSPLibInstance:
+    """Instância TSPLIB carregada: matriz de distâncias e, se conhecido, o ótimo."""
+    name: str
+    edge_weight_type: str
+    instance_id: str
+    coords: np.ndarray
+    dist_matrix: np.ndarray
+    optimum: float = None
+    opt_tour: np.ndarray = None
+
+def percent_gap(cost, optimum):
+    """Distância percentual até o ótimo conhecido (None se não houver ótimo)."""
+    if optimum is None:
+        return None
+    return 100.0 * (cost - optimum) / optimum
+
+# ---------------------------
+# Leitura em streaming
+# ---------------------------
+def _hashed_lines(f, hasher):
+    """Linhas de texto de um arquivo binário, alimentando o hash do conteúdo."""
+    for raw in f:
+        hasher.update(raw)
+        yield raw.decode("ascii", "replace")
+
+def _read_coords(lines, n):
+    """Lê as n linhas `índice x y` de uma seção de coordenadas."""
+    data = np.loadtxt(itertools.islice(lines, n), usecols=(0, 1, 2), ndmin=2)
+    if len(data) != n:
+        raise ValueError(f"seção de coordenadas com {len(data)} linhas, esperado {n}")
+    coords = np.empty((n, 2))
+    coords[data[:, 0].astype(np.intp) - 1] = data[:, 1:]
+    return coords
+
+def _read_numbers(lines, count):
+    """Lê `count` números espalhados por quantas linhas forem necessárias."""
+    out = np.empty(count)
+    filled = 0
+    for line in lines:
+        values = np.array(line.split(), dtype=np.float64)
+        take = min(values.size, count - filled)
+        out[filled:filled + take] = values[:take]
+        filled += take
+        if filled == count:
+            return out
+    raise ValueError(f"EDGE_WEIGHT_SECTION com {filled} pesos, esperado {count}")
+
+def _weight_count(fmt, n):
+    if fmt == "FULL_MATRIX":
+        return n * n
+    if fmt in ("UPPER_ROW", "LOWER_ROW", "UPPER_COL", "LOWER_COL"):
+        return n * (n - 1) // 2
+    if fmt in ("UPPER_DIAG_ROW", "LOWER_DIAG_ROW", "UPPER_DIAG_COL", "LOWER_DIAG_COL"):
+        return n * (n + 1) // 2
+    raise ValueError(f"EDGE_WEIGHT_FORMAT não suportado: {fmt}")
+
+def parse_tsp(path):
+    """
+    Lê um arquivo .tsp linha a linha, sem carregá-lo inteiro na memória.
+    Retorna (cabeçalho, coordenadas ou None, pesos explícitos ou None, hash do conteúdo).
+    """
+    header, coords, weights = {}, None, None
+    hasher = hashlib.sha1()
+    with open(path, "rb") as f:
+        lines = _hashed_lines(f, hasher)
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+            key, _, value = line.partition(":")
+            key = key.strip().upper()
+            if key == "EOF":
+                break
+            n = int(header.get("DIMENSION", 0))
+            if key == "NODE_COORD_SECTION":
+                coords = _read_coords(lines, n)
+            elif key == "DISPLAY_DATA_SECTION":
+                display = _read_coords(lines, n)
+                if coords is None:
+                    coords = display
+            elif key == "EDGE_WEIGHT_SECTION":
+                fmt = header.get("EDGE_WEIGHT_FORMAT", "FULL_MATRIX")
+                weights = _read_numbers(lines, _weight_count(fmt, n))
+            elif key == "FIXED_EDGES_SECTION":
+                for edge in lines:
+                    if edge.strip() == "-1":
+                        break
+            else:
+                header[key] = value.strip()
+        for _ in lines:  # o hash cobre o arquivo inteiro
+            pass
+    return header, coords, weights, hasher.hexdigest()[:16]
+
+def read_opt_tour(path):
+    """Lê a TOUR_SECTION de um .opt.tour; retorna o tour com cidades a partir de 0."""
+    tour = []
+    with open(path) as f:
+        in_tour = False
+        for line in f:
+            line = line.strip()
+            if line.upper().startswith("TOUR_SECTION"):
+                in_tour = True
+                continue
+            if not in_tour or not line:
+                continue
+            values = [int(v) for v in line.split()]
+            if -1 in values:
+                tour.extend(values[:values.index(-1)])
+                break
+            tour.extend(values)
+    return np.array(tour, dtype=np.intp) - 1
+
+# ---------------------------
+# Distâncias (fórmulas da especificação TSPLIB)
+# ---------------------------
+def _nint(x):
+    return np.floor(x + 0.5)
+
+def _geo_radians(coords):
+    """Graus.minutos -> radianos, com PI = 3.141592 como na especificação."""
+    deg = np.trunc(coords)
+    return 3.141592 * (deg + 5.0 * (coords - deg) / 3.0) / 180.0
+
+def _distance_block(kind, a, b):
+    """Distâncias entre os blocos de pontos a (linhas) e b (colunas)."""
+    if kind == "GEO":
+        # a e b já em radianos (_geo_radians); raio RRR = 6378.388
+        lat_a, lon_a = a[:, None, 0], a[:, None, 1]
+        lat_b, lon_b = b[None, :, 0], b[None, :, 1]
+        q1 = np.cos(lon_a - lon_b)
+        q2 = np.cos(lat_a - lat_b)
+        q3 = np.cos(lat_a + lat_b)
+        cos_d = np.clip(0.5 * ((1.0 + q1) * q2 - (1.0 - q1) * q3), -1.0, 1.0)
+        return np.trunc(6378.388 * np.arccos(cos_d) + 1.0)
+
+    diff = a[:, None] - b[None, :]
+    sq = (diff ** 2).sum(axis=2)
+    if kind == "EUC_2D":
+        return _nint(np.sqrt(sq))
+    if kind == "CEIL_2D":
+        return np.ceil(np.sqrt(sq))
+    if kind == "ATT":
+        r = np.sqrt(sq / 10.0)
+        t = _nint(r)
+        return np.where(t < r, t + 1.0, t)
+    raise ValueError(f"EDGE_WEIGHT_TYPE não suportado: {kind}")
+
+def _fill_explicit(out, weights, fmt):
+    n = out.shape[0]
+    if fmt == "FULL_MATRIX":
+        out[:] = weights.reshape(n, n)
+        return
+    # formatos *_COL equivalem ao *_ROW do triângulo oposto (matriz simétrica)
+    row_format = {"UPPER_COL": "LOWER_ROW", "LOWER_COL": "UPPER_ROW",
+                  "UPPER_DIAG_COL": "LOWER_DIAG_ROW", "LOWER_DIAG_COL": "UPPER_DIAG_ROW"}.get(fmt, fmt)
+    upper = row_format.startswith("UPPER")
+    offset = 0 if "DIAG" in row_format else (1 if upper else -1)
+    i, j = np.triu_indices(n, offset) if upper else np.tril_indices(n, offset)
+    out[:] = 0.0
+    out[i, j] = weights
+    out[j, i] = weights
+
+def build_tsplib_matrix(header, coords, weights, dtype=np.float64, block_rows=1024, out=None):
+    """Matriz de distâncias de uma instância já lida, em blocos de linhas."""
+    kind = header.get("EDGE_WEIGHT_TYPE", "EUC_2D")
+    if kind not in EDGE_WEIGHT_TYPES:
+        raise ValueError(f"EDGE_WEIGHT_TYPE não suportado: {kind}")
+    n = int(header["DIMENSION"])
+    if out is None:
+        out = np.empty((n, n), dtype=dtype)
+    if kind == "EXPLICIT":
+        _fill_explicit(out, weights, header.get("EDGE_WEIGHT_FORMAT", "FULL_MATRIX"))
+    else:
+        points = _geo_radians(coords) if kind == "GEO" else coords
+        for start in range(0, n, block_rows):
+            stop = min(start + block_rows, n)
+            out[start:stop] = _distance_block(kind, points[start:stop], points)
+    np.fill_diagonal(out, 0.0)
+    return out
+
+# ---------------------------
+# Carregamento com cache binário
+# ---------------------------
+def _cache_key(path):
+    """Chave barata do arquivo (caminho, tamanho, mtime): reler só quando ele mudar."""
+    st = os.stat(path)
+    payload = f"{os.path.realpath(path)}:{st.st_size}:{st.st_mtime_ns}"
+    return hashlib.sha1(payload.encode()).hexdigest()[:16]
+
+def load_tsplib(path, dtype=np.float64, cache_dir=TSPLIB_CACHE_DIR, block_rows=1024):
+    """
+    Carrega uma instância TSPLIB (EUC_2D, CEIL_2D, GEO, ATT ou EXPLICIT):
+    - na primeira vez o .tsp é lido em streaming e o cabeçalho/coordenadas vão
+      para um .npz e a matriz para um .npy (escrito em blocos, como em
+      instances.load_distance_matrix)
+    - depois a matriz é reaberta com np.load(mmap_mode='r'), sem reprocessar texto
+    - o ótimo vem do <nome>.opt.tour ao lado do arquivo, se existir, ou de
+      KNOWN_OPTIMA
+    """
+    dtype = np.dtype(dtype)
+    os.makedirs(cache_dir, exist_ok=True)
+    key = _cache_key(path)
+    meta_path = os.path.join(cache_dir, f"{key}.npz")
+    matrix_path = os.path.join(cache_dir, f"{key}_{dtype.name}.npy")
+
+    if os.path.exists(meta_path):
+        with np.load(meta_path) as meta:
+            header = dict(zip(meta["header_keys"].tolist(), meta["header_values"].tolist()))
+            coords = meta["coords"] if meta["coords"].size else None
+            instance_id = str(meta["instance_id"])
+        weights = None
+    else:
+        header, coords, weights, instance_id = parse_tsp(path)
+        tmp = f"{meta_path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            np.savez(f, header_keys=np.array(list(header.keys())),
+                     header_values=np.array(list(header.values())),
+                     coords=coords if coords is not None else np.empty((0, 2)),
+                     instance_id=np.array(instance_id))
+        os.replace(tmp, meta_path)
+
+    if not os.path.exists(matrix_path):
+        if weights is None and header.get("EDGE_WEIGHT_TYPE") == "EXPLICIT":
+            header, _, weights, _ = parse_tsp(path)
+        n = int(header["DIMENSION"])
+        tmp = f"{matrix_path}.{os.getpid()}.tmp"
+        out = np.lib.format.open_memmap(tmp, mode="w+", dtype=dtype, shape=(n, n))
+        build_tsplib_matrix(header, coords, weights, dtype, block_rows, out=out)
+        out.flush()
+        del out
+        os.replace(tmp, matrix_path)
+    dist_matrix = np.load(matrix_path, mmap_mode="r")
+
+    name = header.get("NAME", os.path.splitext(os.path.basename(path))[0])
+    opt_tour, optimum = None, KNOWN_OPTIMA.get(name)
+    opt_path = os.path.splitext(path)[0] + ".opt.tour"
+    if os.path.exists(opt_path):
+        opt_tour = read_opt_tour(opt_path)
+        optimum = float(tour_length(opt_tour, dist_matrix))
+
+    return TSPLibInstance(name, header.get("EDGE_WEIGHT_TYPE", "EUC_2D"), instance_id,
+                          coords, dist_matrix, optimum, opt_tour)